@@ -54,7 +54,7 @@
     'version': '16.0.3.0.0',
 
     # Dependencies
-    'depends': ['base', 'contacts', 'mail', 'crm'],
+    'depends': ['base', 'bus', 'contacts', 'mail', 'crm'],
 
     # Data files
     'data': [
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http
+from odoo.http import request
+from odoo.addons.mail.controllers.discuss import DiscussController
+
+
+class PartnerChatterController(DiscussController):
+    """Serve the partner chatter as a merged timeline of the partner and its leads"""
+
+    @http.route()
+    def mail_thread_messages(self, thread_model, thread_id, max_id=None, min_id=None, limit=30, **kwargs):
+        if thread_model != 'res.partner':
+            return super().mail_thread_messages(thread_model, thread_id, max_id=max_id, min_id=min_id, limit=limit, **kwargs)
+        partner = request.env['res.partner'].browse(int(thread_id))
+        messages = request.env['mail.message']._message_fetch(
+            domain=partner._get_merged_chatter_domain() + [('message_type', '!=', 'user_notification')],
+            max_id=max_id, min_id=min_id, limit=limit,
+        )
+        if not request.env.user._is_public():
+            messages.set_message_done()
+        return partner._format_merged_chatter_messages(messages)
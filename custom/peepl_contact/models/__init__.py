@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from . import models
-from . import crm
\ No newline at end of file
+from . import crm
+from . import ir_websocket
\ No newline at end of file
@@ -1,63 +1,99 @@
 # inheriting from crm.lead to override the all operations, every operation will be logged into the contact related to the lead
 
 import logging
+from collections import defaultdict
 from odoo import models, api, fields
 _logger = logging.getLogger(__name__)
 class CrmLead(models.Model):
     _inherit = 'crm.lead'
 
-    def message_post(self, **kwargs):
-        res = super(CrmLead, self).message_post(**kwargs)
-        # Also post to related partner if exists
-        if self.partner_id and getattr(self.partner_id, 'enable_crm_lead_logging', False):
-            # Prefix for clarity
-            body = kwargs.get('body', '')
-            subject = kwargs.get('subject', 'Lead Note')
-            partner_body = f"<b>[Lead Note]</b> (from Lead: {self.name})<br/>{body}"
-            self.partner_id.message_post(
-                body=partner_body,
-                message_type=kwargs.get('message_type', 'comment'),
-                subject=subject
-            )
-        return res
-
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create method to log activity in related contact"""
-        lead = super(CrmLead, self).create(vals)
-        if lead.partner_id and getattr(lead.partner_id, 'enable_crm_activity_logging', False):
-            lead.partner_id.log_activity('create', lead)
-        return lead
+        leads = super(CrmLead, self).create(vals_list)
+        self.env['res.partner']._log_lead_activities([
+            (lead.partner_id, 'create', lead, None)
+            for lead in leads._get_activity_logging_leads()
+        ])
+        return leads
+
+    def _get_activity_logging_leads(self, vals=None):
+        """Leads whose contact, after writing vals, logs CRM lead activity"""
+        if vals and 'partner_id' in vals:
+            partner = self.env['res.partner'].browse(vals['partner_id'])
+            return self if partner.enable_crm_activity_logging else self.browse()
+        return self.filtered(lambda lead: lead.partner_id.enable_crm_activity_logging)
+
+    def _read_activity_values(self, field_names):
+        """Raw values of the given fields per lead, in one read"""
+        if not field_names:
+            return {lead.id: {} for lead in self}
+        return {values['id']: values for values in self.read(field_names, load=None)}
+
+    def _format_activity_changes(self, field_names, old_values, new_values):
+        """Readable changes per lead; relational values are resolved with one name_get per comodel"""
+        raw_changes = {}
+        ids_by_model = defaultdict(set)
+        for lead in self:
+            for field_name in field_names:
+                old_val = old_values[lead.id][field_name]
+                new_val = new_values[lead.id][field_name]
+                if old_val == new_val:
+                    continue
+                raw_changes.setdefault(lead.id, []).append((field_name, old_val, new_val))
+                field = self._fields[field_name]
+                if field.relational:
+                    for value in (old_val, new_val):
+                        ids_by_model[field.comodel_name].update(value if isinstance(value, list) else [value] if value else [])
+        names = {
+            model: dict(self.env[model].browse(ids).exists().name_get())
+            for model, ids in ids_by_model.items()
+        }
+
+        def get_display(field, value):
+            if field.relational:
+                ids = value if isinstance(value, list) else [value] if value else []
+                return ', '.join(names[field.comodel_name].get(rec_id, str(rec_id)) for rec_id in ids) or '(empty)'
+            return str(value) if value not in [False, None, ''] else '(empty)'
+
+        return {
+            lead_id: [
+                {
+                    'field': field_name,
+                    'old': get_display(self._fields[field_name], old_val),
+                    'new': get_display(self._fields[field_name], new_val),
+                }
+                for field_name, old_val, new_val in changes
+            ]
+            for lead_id, changes in raw_changes.items()
+        }
 
     def write(self, vals):
         """Override write method to log activity in related contact with changed fields"""
-        # Capture old values for changed fields
-        changed_fields = list(vals.keys())
-        old_values = {}
-        for lead in self:
-            for field in changed_fields:
-                old_values.setdefault(lead.id, {})[field] = getattr(lead, field, False)
+        logging_leads = self._get_activity_logging_leads(vals)
+        if not logging_leads:
+            return super(CrmLead, self).write(vals)
+        # Capture old values of the written stored fields in one read
+        tracked_fields = [
+            name for name in vals
+            if name in self._fields and self._fields[name].store and self._fields[name].type != 'binary'
+        ]
+        old_values = logging_leads._read_activity_values(tracked_fields)
         # Perform the write
         result = super(CrmLead, self).write(vals)
         # Log changes after update
-        for lead in self:
-            if lead.partner_id and getattr(lead.partner_id, 'enable_crm_activity_logging', False):
-                changes = []
-                for field in changed_fields:
-                    old_val = old_values.get(lead.id, {}).get(field, False)
-                    new_val = getattr(lead, field, False)
-                    if old_val != new_val:
-                        changes.append({
-                            'field': field,
-                            'old': old_val,
-                            'new': new_val
-                        })
-                lead.partner_id.log_activity('write', lead, changes)
+        new_values = logging_leads._read_activity_values(tracked_fields)
+        changes = logging_leads._format_activity_changes(tracked_fields, old_values, new_values)
+        self.env['res.partner']._log_lead_activities([
+            (lead.partner_id, 'write', lead, changes.get(lead.id, []))
+            for lead in logging_leads
+        ])
         return result
 
     def unlink(self):
         """Override unlink method to log activity in related contact"""
-        for lead in self:
-            if lead.partner_id and getattr(lead.partner_id, 'enable_crm_activity_logging', False):
-                lead.partner_id.log_activity('unlink', lead)
+        self.env['res.partner']._log_lead_activities([
+            (lead.partner_id, 'unlink', lead, None)
+            for lead in self._get_activity_logging_leads()
+        ])
         return super(CrmLead, self).unlink()
\ No newline at end of file
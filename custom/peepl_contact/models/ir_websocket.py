@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Subscribe internal users to the broadcast channel of contract reminders"""
+        if self.env.uid and self.env.user.has_group('base.group_user'):
+            channels = list(channels)
+            channels.append(self.env.ref('base.group_user'))
+        return super()._build_bus_channel_list(channels)
@@ -1,9 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import base64
+import logging
+import threading
 from odoo import models, fields, api
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
+_logger = logging.getLogger(__name__)
+
+# Partner names listed in the reminder push notification digest
+REMINDER_DIGEST_MAX_NAMES = 5
+
+# Partners processed per transaction by the reminder cron
+REMINDER_BATCH_SIZE = 100
+
 
 class ResPartner(models.Model):
     _inherit = 'res.partner'
@@ -11,7 +22,7 @@ class ResPartner(models.Model):
     enable_crm_lead_logging = fields.Boolean(
         string='Enable CRM Lead Logging',
         default=True,
-        help='Enable logging of CRM lead operations in this contact'
+        help='Show the messages of the related CRM leads in the chatter of this contact'
     )
 
     enable_crm_activity_logging = fields.Boolean(
@@ -20,9 +31,70 @@ class ResPartner(models.Model):
         help='Enable logging of CRM activity operations in this contact'
     )
 
+    def _get_merged_chatter_domain(self):
+        """mail.message domain of the contact chatter: the messages of the contact
+        and, when lead logging is enabled, those of its leads, read at display time
+        instead of being copied onto the contact"""
+        self.ensure_one()
+        domain = [('model', '=', 'res.partner'), ('res_id', '=', self.id)]
+        if not self.enable_crm_lead_logging:
+            return domain
+        leads = self.env['crm.lead'].with_context(active_test=False).search([('partner_id', '=', self.id)])
+        if not leads:
+            return domain
+        return ['|', '&'] + domain + ['&', ('model', '=', 'crm.lead'), ('res_id', 'in', leads.ids)]
+
+    def _format_merged_chatter_messages(self, messages):
+        """message_format() of messages read with ``_get_merged_chatter_domain``.
+
+        The web client only displays in a thread the messages originating from
+        it, the lead messages are therefore formatted as messages of this contact,
+        their subject naming the lead they come from.
+        """
+        self.ensure_one()
+        formatted = messages.message_format()
+        for vals in formatted:
+            if vals['model'] == 'crm.lead':
+                vals.update({
+                    'model': self._name,
+                    'res_id': self.id,
+                    'subject': ' - '.join(filter(None, [vals.get('record_name'), vals.get('subject')])),
+                })
+        return formatted
+
     def log_activity(self, action_type, lead, changes=None):
         """Log crm.lead operation to this contact with readable message and changed fields (human-friendly for relations)"""
-    
+        self.ensure_one()
+        self._log_lead_activities([(self, action_type, lead, changes)])
+
+    @api.model
+    def _log_lead_activities(self, entries):
+        """Write crm.lead operation logs on contacts as lightweight notes.
+
+        ``entries`` is a list of ``(partner, action_type, lead, changes)``. All
+        notes are created with one mail.message create, without the message_post
+        machinery (followers, notifications, tracking). Message ids follow the
+        order of ``entries``, which keeps the timeline of each contact in order.
+        """
+        if not entries:
+            return self.env['mail.message']
+        note_subtype = self.env.ref('mail.mt_note')
+        author = self.env.user.partner_id
+        vals_list = [{
+            'model': 'res.partner',
+            'res_id': partner.id,
+            'body': self._prepare_lead_activity_body(action_type, lead, changes),
+            'subject': 'Lead Log',
+            'message_type': 'notification',
+            'subtype_id': note_subtype.id,
+            'author_id': author.id,
+            'email_from': author.email_formatted,
+        } for partner, action_type, lead, changes in entries]
+        return self.env['mail.message'].sudo().create(vals_list)
+
+    @api.model
+    def _prepare_lead_activity_body(self, action_type, lead, changes=None):
+        """Readable log message of a crm.lead operation"""
         user_name = self.env.user.name
         lead_name = lead.name or 'No Name'
         lead_type = dict(lead._fields['type'].selection).get(lead.type, '') if hasattr(lead, 'type') else ''
@@ -42,89 +114,13 @@ class ResPartner(models.Model):
                 message += f"• Deadline: {lead.date_deadline}<br/>"
         if action_type == 'write' and changes:
             message += "<b>• Changed Fields:</b><br/>"
+            # Values are already human-readable, see crm.lead._format_activity_changes
             for change in changes:
-                field = change['field']
-                old = change['old']
-                new = change['new']
-                field_obj = lead._fields.get(field)
-                if field_obj:
-                    if field_obj.type == 'many2one':
-                        def get_rel_display(val):
-                            if not val:
-                                return '(empty)'
-                            if isinstance(val, models.BaseModel):
-                                return getattr(val, 'display_name', None) or getattr(val, 'name', None) or str(val)
-                            elif isinstance(val, int):
-                                rec = lead.env[field_obj.comodel_name].browse(val)
-                                if rec.exists():
-                                    return getattr(rec, 'display_name', None) or getattr(rec, 'name', None) or str(val)
-                                else:
-                                    return str(val)
-                            return str(val)
-                        old_display = get_rel_display(old)
-                        new_display = get_rel_display(new)
-                        message += f"- <b>{field}</b>: <span style='color:#888'>{old_display}</span> → <span style='color:#007700'>{new_display}</span><br/>"
-                    elif field_obj.type == 'many2many':
-                        def get_m2m_display(val):
-                            if not val:
-                                return '(empty)'
-                            ids = []
-                            # Odoo may pass as list of ids, set, or recordset
-                            if isinstance(val, models.BaseModel):
-                                ids = val.ids
-                            elif isinstance(val, (list, set, tuple)):
-                                ids = list(val)
-                            elif isinstance(val, int):
-                                ids = [val]
-                            else:
-                                try:
-                                    ids = list(val)
-                                except Exception:
-                                    ids = []
-                            if not ids:
-                                return '(empty)'
-                            recs = lead.env[field_obj.comodel_name].browse(ids)
-                            names = [getattr(rec, 'display_name', None) or getattr(rec, 'name', None) or str(rec.id) for rec in recs if rec.exists()]
-                            return ', '.join(names) if names else '(empty)'
-                        old_display = get_m2m_display(old)
-                        new_display = get_m2m_display(new)
-                        message += f"- <b>{field}</b>: <span style='color:#888'>{old_display}</span> → <span style='color:#007700'>{new_display}</span><br/>"
-                    elif field_obj.type == 'one2many':
-                        def get_o2m_display(val):
-                            if not val:
-                                return '(empty)'
-                            ids = []
-                            # Odoo may pass as recordset, list of ids, etc.
-                            if isinstance(val, models.BaseModel):
-                                ids = val.ids
-                            elif isinstance(val, (list, set, tuple)):
-                                ids = list(val)
-                            elif isinstance(val, int):
-                                ids = [val]
-                            else:
-                                try:
-                                    ids = list(val)
-                                except Exception:
-                                    ids = []
-                            if not ids:
-                                return '(empty)'
-                            recs = lead.env[field_obj.comodel_name].browse(ids)
-                            names = [getattr(rec, 'display_name', None) or getattr(rec, 'name', None) or str(rec.id) for rec in recs if rec.exists()]
-                            return ', '.join(names) if names else '(empty)'
-                        old_display = get_o2m_display(old)
-                        new_display = get_o2m_display(new)
-                        message += f"- <b>{field}</b>: <span style='color:#888'>{old_display}</span> → <span style='color:#007700'>{new_display}</span><br/>"
-                    else:
-                        old_str = str(old) if old not in [False, None, ''] else '(empty)'
-                        new_str = str(new) if new not in [False, None, ''] else '(empty)'
-                        message += f"- <b>{field}</b>: <span style='color:#888'>{old_str}</span> → <span style='color:#007700'>{new_str}</span><br/>"
-                else:
-                    old_str = str(old) if old not in [False, None, ''] else '(empty)'
-                    new_str = str(new) if new not in [False, None, ''] else '(empty)'
-                    message += f"- <b>{field}</b>: <span style='color:#888'>{old_str}</span> → <span style='color:#007700'>{new_str}</span><br/>"
+                message += f"- <b>{change['field']}</b>: <span style='color:#888'>{change['old']}</span> → <span style='color:#007700'>{change['new']}</span><br/>"
         if action_type == 'unlink':
             message += "• This lead/opportunity was deleted."
-        self.message_post(body=message, message_type='notification', subject='Lead Log')
+        return message
+
     # Documents section fields
     sla = fields.Binary(string='SLA Document', help='Service Level Agreement document')
     sla_filename = fields.Char(string='SLA Filename')
@@ -154,6 +150,19 @@ class ResPartner(models.Model):
     reminder_sent = fields.Boolean(string='Reminder Sent', default=False, help='Track if reminder has been sent')
     reminder_active = fields.Boolean(string='Reminder Active', default=True, help='Enable/disable reminder for this contact')
 
+    def init(self):
+        """Partial index covering only the partners still waiting for their reminder,
+        so the reminder cron reads the due rows instead of scanning the partner table"""
+        super().init()
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS res_partner_reminder_due_idx
+            ON res_partner (reminder_date, id)
+            WHERE active
+              AND reminder_active
+              AND reminder_sent IS NOT TRUE
+              AND reminder_date IS NOT NULL
+        """)
+
     @api.depends('expiration_date', 'reminder_number', 'reminder_period', 'select_date', 'reminder_date_manual')
     def _compute_reminder_date(self):
         """Compute reminder date based on agreement date and period settings"""
@@ -186,105 +195,176 @@ class ResPartner(models.Model):
 
     def send_reminder_notification(self):
         """Send reminder via email and create internal notification"""
-        for record in self:
-            if not record.reminder_active or record.reminder_sent:
-                continue
-                
-            # Create internal activity/notification
-            self.env['mail.activity'].create({
-                'activity_type_id': self.env.ref('mail.mail_activity_data_todo').id,
-                'summary': f'Contract Reminder for {record.name}',
-                'note': f'Reminder: Agreement date is approaching for {record.name} on {record.agreement_date}',
-                'res_id': record.id,
-                'res_model_id': self.env.ref('base.model_res_partner').id,
-                'user_id': self.env.user.id,
-                'date_deadline': fields.Date.today(),
-            })
-            
-            # Send email if template is provided
+        reminded = self._send_reminders()
+        
+        # Send push notification to web client
+        reminded._send_push_notification()
+
+    def _send_reminders(self):
+        """Create the reminder activities, queue the emails and flag the partners
+        of self as reminded, in batch. Returns the partners actually reminded."""
+        to_remind = self.filtered(lambda r: r.reminder_active and not r.reminder_sent)
+        if not to_remind:
+            return to_remind
+        
+        # Create internal activities/notifications
+        activity_type = self.env.ref('mail.mail_activity_data_todo')
+        partner_model = self.env.ref('base.model_res_partner')
+        today = fields.Date.today()
+        self.env['mail.activity'].create([{
+            'activity_type_id': activity_type.id,
+            'summary': f'Contract Reminder for {record.name}',
+            'note': f'Reminder: Agreement date is approaching for {record.name} on {record.agreement_date}',
+            'res_id': record.id,
+            'res_model_id': partner_model.id,
+            'user_id': self.env.user.id,
+            'date_deadline': today,
+        } for record in to_remind])
+        
+        # Queue emails if template is provided, the mail queue cron sends them
+        mail_values_list = []
+        for record in to_remind:
             if record.email_template and record.email:
-                self._send_reminder_email(record)
-            
-            # Send push notification to web client
-            self._send_push_notification(record)
-            
-            # Mark as sent
-            record.reminder_sent = True
-            
-            # Log the reminder activity
-            message = f"<b>🔔 Reminder Sent:</b><br/>• Agreement Date: {record.agreement_date}<br/>• Reminder Date: {record.reminder_date}<br/>• Sent to: {record.email or 'No email'}"
-            record.message_post(body=message, message_type='notification')
+                mail_values = record._prepare_reminder_mail_values()
+                if mail_values:
+                    mail_values_list.append(mail_values)
+        self.env['mail.mail'].create(mail_values_list)
+        
+        # Mark as sent
+        to_remind.write({'reminder_sent': True})
+        
+        # Log the reminder on the contacts as lightweight notes, with one mail.message create
+        note_subtype = self.env.ref('mail.mt_note')
+        author = self.env.user.partner_id
+        self.env['mail.message'].sudo().create([{
+            'model': 'res.partner',
+            'res_id': record.id,
+            'body': f"<b>🔔 Reminder Sent:</b><br/>• Agreement Date: {record.agreement_date}<br/>• Reminder Date: {record.reminder_date}<br/>• Sent to: {record.email or 'No email'}",
+            'message_type': 'notification',
+            'subtype_id': note_subtype.id,
+            'author_id': author.id,
+            'email_from': author.email_formatted,
+        } for record in to_remind])
+        return to_remind
 
-    def _send_reminder_email(self, record):
-        """Send customized email reminder"""
+    def _prepare_reminder_mail_values(self):
+        """Values of the customized email reminder"""
+        self.ensure_one()
         try:
             # Prepare email template variables
             template_vars = {
-                'partner_name': record.name,
-                'expiration_date': record.expiration_date,
-                'reminder_date': record.reminder_date,
+                'partner_name': self.name,
+                'expiration_date': self.expiration_date,
+                'reminder_date': self.reminder_date,
                 'company_name': self.env.company.name,
             }
             
             # Replace template variables in email content
-            email_body = record.email_template
+            email_body = self.email_template
             for var, value in template_vars.items():
                 email_body = email_body.replace(f'{{{{{var}}}}}', str(value or ''))
             
-            # Create and send email
-            mail_values = {
-                'subject': f'Contract Reminder - {record.name}',
+            return {
+                'subject': f'Contract Reminder - {self.name}',
                 'body_html': email_body,
-                'email_to': record.email,
+                'email_to': self.email,
                 'email_from': self.env.company.email or self.env.user.email,
                 'reply_to': self.env.company.email or self.env.user.email,
             }
             
-            mail = self.env['mail.mail'].create(mail_values)
-            mail.send()
-            
         except Exception as e:
             # Log error but don't break the process
-            record.message_post(body=f"<b>❌ Email Error:</b> {str(e)}", message_type='comment')
+            self.message_post(body=f"<b>❌ Email Error:</b> {str(e)}", message_type='comment')
+            return False
 
-    def _send_push_notification(self, record):
-        """Send push notification to web client"""
+    def _send_push_notification(self):
+        """Send one digest push notification for the reminders of all partners in self"""
+        if not self:
+            return
         try:
-            notification_message = f"Contract reminder for {record.name} - Agreement date: {record.agreement_date}"
-            
-            # Send notification to all users who can access this partner
-            users = self.env['res.users'].search([('groups_id', 'in', [self.env.ref('base.group_user').id])])
+            names = ', '.join(self[:REMINDER_DIGEST_MAX_NAMES].mapped('name'))
+            if len(self) > REMINDER_DIGEST_MAX_NAMES:
+                names += f" (+{len(self) - REMINDER_DIGEST_MAX_NAMES} more)"
+            if len(self) == 1:
+                notification_message = f"Contract reminder for {self.name} - Agreement date: {self.agreement_date}"
+            else:
+                notification_message = f"{len(self)} contract reminders are due: {names}"
             
-            for user in users:
-                self.env['bus.bus']._sendone(
-                    f'res.users/{user.id}',
-                    'simple_notification',
-                    {
-                        'title': 'Contract Reminder',
-                        'message': notification_message,
-                        'type': 'info',
-                        'sticky': False,
-                    }
-                )
+            # Broadcast once on the internal users channel instead of once per user
+            self.env['bus.bus']._sendone(
+                self.env.ref('base.group_user'),
+                'simple_notification',
+                {
+                    'title': 'Contract Reminder',
+                    'message': notification_message,
+                    'type': 'info',
+                    'sticky': False,
+                }
+            )
         except Exception as e:
             # Log error but don't break the process
-            record.message_post(body=f"<b>❌ Notification Error:</b> {str(e)}", message_type='comment')
+            _logger.error(f"Failed to send contract reminder push notification for partners {self.ids}: {e}")
 
     @api.model
-    def _cron_check_reminders(self):
-        """Cron job to check and send due reminders"""
+    def _claim_due_reminders(self, today, limit, exclude_ids=()):
+        """Select and lock the next batch of partners with a due reminder.
+
+        Rows locked by a concurrent run are skipped rather than waited for, as
+        well as the partners of ``exclude_ids``. The conditions match the
+        ``res_partner_reminder_due_idx`` partial index.
+        """
+        self.flush_model(['active', 'reminder_active', 'reminder_sent', 'reminder_date'])
+        self.env.cr.execute("""
+            SELECT id FROM res_partner
+            WHERE active
+              AND reminder_active
+              AND reminder_sent IS NOT TRUE
+              AND reminder_date IS NOT NULL
+              AND reminder_date <= %s
+              AND id != ALL(%s)
+            ORDER BY reminder_date, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        """, (today, list(exclude_ids), limit))
+        return self.browse([row[0] for row in self.env.cr.fetchall()])
+
+    @api.model
+    def _cron_check_reminders(self, batch_size=REMINDER_BATCH_SIZE):
+        """Cron job to check and send due reminders.
+
+        Due partners are claimed and processed by batches of ``batch_size``, with a
+        commit after each batch. A failing batch is retried partner by partner, each
+        in its own savepoint: failing partners are logged and left out of the rest
+        of the run, so they never hold up the partners queued after them. They are
+        retried by the next run.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
         today = fields.Date.today()
+        reminded = self.browse()
+        failed = self.browse()
         
-        # Find partners with due reminders
-        partners_to_remind = self.search([
-            ('reminder_active', '=', True),
-            ('reminder_sent', '=', False),
-            ('reminder_date', '<=', today),
-            ('reminder_date', '!=', False),
-        ])
+        while True:
+            partners = self._claim_due_reminders(today, batch_size, exclude_ids=failed.ids)
+            if not partners:
+                break
+            try:
+                with self.env.cr.savepoint():
+                    reminded |= partners._send_reminders()
+            except Exception as e:
+                _logger.warning(f"Contract reminder batch failed, retrying partner by partner: {e}")
+                for partner in partners:
+                    try:
+                        with self.env.cr.savepoint():
+                            reminded |= partner._send_reminders()
+                    except Exception as partner_error:
+                        failed |= partner
+                        _logger.error(f"Failed to send the contract reminder of partner {partner.id}: {partner_error}")
+            if auto_commit:
+                self.env.cr.commit()
+            _logger.info(f"Contract reminders: {len(reminded)} partners reminded so far, {len(failed)} failed")
         
-        for partner in partners_to_remind:
-            partner.send_reminder_notification()
+        # One digest notification per run
+        reminded._send_push_notification()
 
     def reset_reminder(self):
         """Reset reminder status to allow sending again"""
@@ -320,6 +400,27 @@ class ResPartner(models.Model):
         
         return record
 
+    def _get_document_attachment_metadata(self, field_names):
+        """Metadata of the attachments storing the given binary fields of the partners.
+
+        Returns ``{(partner_id, field_name): {'checksum': ..., 'file_size': ...}}``
+        for the files that exist, without reading their content from the filestore.
+        """
+        if not field_names or not self.ids:
+            return {}
+        attachments = self.env['ir.attachment'].sudo().search_read([
+            ('res_model', '=', self._name),
+            ('res_field', 'in', field_names),
+            ('res_id', 'in', self.ids),
+        ], ['res_id', 'res_field', 'checksum', 'file_size'])
+        return {
+            (attachment['res_id'], attachment['res_field']): {
+                'checksum': attachment['checksum'],
+                'file_size': attachment['file_size'],
+            }
+            for attachment in attachments
+        }
+
     def write(self, vals):
         """Override write to log document changes"""
         document_fields = {
@@ -328,6 +429,15 @@ class ResPartner(models.Model):
             'kontrak_kerja': 'Kontrak Kerja Document'
         }
         
+        # Look up the stored files once for the whole recordset, without their content
+        changed_documents = [field_name for field_name in document_fields if field_name in vals]
+        old_documents = self._get_document_attachment_metadata(changed_documents)
+        new_checksums = {}
+        for field_name in changed_documents:
+            if vals[field_name]:
+                new_checksums[field_name] = self.env['ir.attachment']._compute_checksum(
+                    base64.b64decode(vals[field_name]))
+        
         # Track changes for each record
         for record in self:
             change_logs = []
@@ -335,7 +445,8 @@ class ResPartner(models.Model):
             # Track document file changes
             for field_name, field_label in document_fields.items():
                 if field_name in vals:
-                    old_file = getattr(record, field_name)
+                    old_metadata = old_documents.get((record.id, field_name))
+                    old_file = bool(old_metadata)
                     new_file = vals[field_name]
                     old_filename = getattr(record, f'{field_name}_filename') or 'Unknown file'
                     new_filename = vals.get(f'{field_name}_filename', 'Unknown file')
@@ -350,7 +461,7 @@ class ResPartner(models.Model):
                     elif old_file and new_file and old_filename != new_filename:
                         # File replaced
                         change_logs.append(f"• 🔄 <b>Replaced</b> {field_label}: {old_filename} → {new_filename}")
-                    elif old_file and new_file:
+                    elif old_file and new_file and old_metadata['checksum'] != new_checksums[field_name]:
                         # File updated (same name but different content)
                         change_logs.append(f"• ✏️ <b>Updated</b> {field_label}: {new_filename}")
             
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+from odoo.tests.common import HttpCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestPartnerChatter(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner = cls.env['res.partner'].create({'name': 'Chatter Partner'})
+        cls.lead = cls.env['crm.lead'].create({'name': 'Chatter Lead', 'partner_id': cls.partner.id})
+        cls.other_lead = cls.env['crm.lead'].create({'name': 'Other Lead'})
+        cls.partner_message = cls.partner.message_post(body='Posted on the partner', message_type='comment')
+        cls.lead_message = cls.lead.message_post(body='Posted on the lead', message_type='comment')
+        cls.other_message = cls.other_lead.message_post(body='Posted on another lead', message_type='comment')
+
+    def _fetch_partner_thread(self):
+        response = self.url_open(
+            '/mail/thread/messages',
+            data=json.dumps({
+                'jsonrpc': '2.0',
+                'method': 'call',
+                'params': {'thread_model': 'res.partner', 'thread_id': self.partner.id, 'limit': 100},
+            }),
+            headers={'Content-Type': 'application/json'},
+        )
+        return {message['id']: message for message in response.json()['result']}
+
+    def test_merged_domain(self):
+        """The chatter domain covers the contact and its leads, unless lead logging is disabled"""
+        messages = self.env['mail.message'].search(self.partner._get_merged_chatter_domain())
+        self.assertIn(self.partner_message, messages)
+        self.assertIn(self.lead_message, messages)
+        self.assertNotIn(self.other_message, messages)
+
+        self.partner.enable_crm_lead_logging = False
+        messages = self.env['mail.message'].search(self.partner._get_merged_chatter_domain())
+        self.assertIn(self.partner_message, messages)
+        self.assertNotIn(self.lead_message, messages)
+
+    def test_thread_messages_route(self):
+        """The partner thread returns the lead messages as messages of the partner"""
+        self.authenticate('admin', 'admin')
+        messages = self._fetch_partner_thread()
+        self.assertIn(self.partner_message.id, messages)
+        self.assertNotIn(self.other_message.id, messages)
+        lead_message = messages[self.lead_message.id]
+        self.assertEqual(lead_message['model'], 'res.partner')
+        self.assertEqual(lead_message['res_id'], self.partner.id)
+        self.assertIn('Chatter Lead', lead_message['subject'])
+        self.assertEqual(list(messages), sorted(messages, reverse=True), 'Messages are returned newest first')
+
+        self.partner.enable_crm_lead_logging = False
+        self.env.flush_all()
+        self.assertNotIn(self.lead_message.id, self._fetch_partner_thread())
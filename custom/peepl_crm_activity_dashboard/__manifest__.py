@@ -17,7 +17,7 @@
         * Detailed activity information including lead details, assigned users, and notes
         * Access control through security groups
         * Enhanced search and grouping capabilities
-        * Real-time activity status tracking
+        * Real-time activity status tracking (row deltas pushed over the bus)
     """,
 
     'author': "Ahmad Rangga",
@@ -26,7 +26,7 @@
     'version': '1.0.0',
 
     # Dependencies
-    'depends': ['base', 'crm', 'mail'],
+    'depends': ['base', 'bus', 'crm', 'mail'],
 
     # Data files
     'data': [
@@ -38,6 +38,14 @@
         'views/menu_views.xml',
         # 'views/assets.xml',  # Temporarily disabled
     ],
+
+    'assets': {
+        'web.assets_backend': [
+            'peepl_crm_activity_dashboard/static/src/js/crm_activity_dashboard_bus.js',
+            'peepl_crm_activity_dashboard/static/src/js/crm_activity_counters_systray.js',
+            'peepl_crm_activity_dashboard/static/src/xml/crm_activity_counters_systray.xml',
+        ],
+    },
     
     # Demo data
     'demo': [],
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
+# mail_activity_done first: the dashboard view reads its table, and the KPI
+# counters are rebuilt from the dashboard view
+from . import mail_activity_done
 from . import crm_activity_dashboard
+from . import crm_activity_kpi
 from . import crm_activity_wizard
-from . import mail_activity_done
-from . import activity_mark_done_wizard
\ No newline at end of file
+from . import activity_mark_done_wizard
+from . import ir_attachment
+from . import ir_websocket
\ No newline at end of file
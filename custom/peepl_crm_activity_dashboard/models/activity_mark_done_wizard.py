@@ -12,11 +12,10 @@ class ActivityMarkDoneWizard(models.TransientModel):
     activity_dashboard_id = fields.Many2one(
         'crm.activity.dashboard', 
         string='Activity Dashboard Record',
-        required=True
     )
     
     # Store activity data as plain fields instead of references
-    activity_id_original = fields.Integer('Original Activity ID', required=True)
+    activity_id_original = fields.Integer('Original Activity ID')
     activity_type_id = fields.Many2one('mail.activity.type', string='Activity Type', readonly=True)
     summary = fields.Char('Summary', readonly=True)
     lead_name = fields.Char('Lead/Opportunity', readonly=True)
@@ -32,6 +31,16 @@ class ActivityMarkDoneWizard(models.TransientModel):
         ('3', 'Very High')
     ], string='Priority', readonly=True, default='1')
     
+    # Activities completed together when several dashboard rows are selected
+    activity_ids = fields.Many2many(
+        'mail.activity',
+        'activity_mark_done_wizard_activity_rel',
+        'wizard_id',
+        'activity_id',
+        string='Activities'
+    )
+    activity_count = fields.Integer('Number of Activities', compute='_compute_activity_count')
+    
     # Input fields
     feedback = fields.Html('Feedback', help='Provide feedback for this completed activity')
     attachment_ids = fields.Many2many(
@@ -43,11 +52,26 @@ class ActivityMarkDoneWizard(models.TransientModel):
         help='Attach files to this completed activity'
     )
 
+    @api.depends('activity_ids')
+    def _compute_activity_count(self):
+        for wizard in self:
+            wizard.activity_count = len(wizard.activity_ids)
+
     @api.model
     def default_get(self, fields_list):
         """Set default values from context"""
         result = super().default_get(fields_list)
         
+        # Several dashboard rows selected: complete all their active activities at once
+        dashboard_ids = self.env.context.get('active_ids') or []
+        if self.env.context.get('active_model') == 'crm.activity.dashboard' and len(dashboard_ids) > 1:
+            rows = self.env['crm.activity.dashboard'].search_read(
+                [('id', 'in', dashboard_ids), ('record_source', '=', 'active')],
+                ['activity_id'],
+            )
+            result['activity_ids'] = [(6, 0, [row['activity_id'] for row in rows])]
+            return result
+        
         try:
             # Get the activity dashboard record from context
             dashboard_id = self.env.context.get('active_id')
@@ -80,6 +104,9 @@ class ActivityMarkDoneWizard(models.TransientModel):
         """Mark the activity as done with feedback and attachments"""
         self.ensure_one()
         
+        if self.activity_ids:
+            return self._action_mark_done_bulk()
+        
         try:
             # Get the activity record using the stored ID
             activity = self.env['mail.activity'].browse(self.activity_id_original)
@@ -120,23 +147,23 @@ class ActivityMarkDoneWizard(models.TransientModel):
             # STEP 2: Prepare attachment IDs for the action_feedback call
             attachment_ids = []
             if self.attachment_ids:
-                for attachment in self.attachment_ids:
-                    # Create copies for the mail message
-                    try:
-                        message_attachment = attachment.copy({
+                # Create copies for the mail message, sharing the stored files
+                try:
+                    with self.env.cr.savepoint():
+                        attachment_ids = self.attachment_ids._copy_shared_content({
                             'res_model': 'mail.message',
                             'res_id': 0,
-                        })
-                        attachment_ids.append(message_attachment.id)
-                    except Exception as e:
-                        _logger.warning(f"Failed to copy attachment {attachment.id}: {e}")
+                        }).ids
+                except Exception as e:
+                    _logger.warning(f"Failed to copy attachments {self.attachment_ids.ids}: {e}")
             
             # STEP 3: Store summary for success message (before activity is deleted)
             activity_summary = self.summary
             
             # STEP 4: Mark the original activity as done (this will DELETE the activity)
             _logger.info(f"Calling action_feedback on activity {activity.id}")
-            message_id = activity.action_feedback(
+            # The done record was created above, don't snapshot the activity again
+            message_id = activity.with_context(skip_activity_done_snapshot=True).action_feedback(
                 feedback=self.feedback,
                 attachment_ids=attachment_ids if attachment_ids else None
             )
@@ -192,6 +219,38 @@ class ActivityMarkDoneWizard(models.TransientModel):
                 }
             }
 
+    def _action_mark_done_bulk(self):
+        """Mark all selected activities as done with the same feedback and attachments"""
+        activities = self.activity_ids.exists()
+        if not activities:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Error',
+                    'message': 'Activities not found or already completed.',
+                    'type': 'warning',
+                }
+            }
+        
+        done_activities = self.env['mail.activity.done'].mark_activities_done(
+            activities,
+            feedback=self.feedback,
+            attachment_ids=self.attachment_ids.ids if self.attachment_ids else None
+        )
+        
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Activities Completed',
+                'message': f'{len(done_activities)} activities have been marked as done successfully.',
+                'type': 'success',
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
+
     def action_cancel(self):
         """Cancel the wizard"""
         return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file
@@ -2,9 +2,22 @@
 from odoo import models, fields, api, tools
 from datetime import datetime, date, timedelta
 import logging
+import psycopg2
 
 _logger = logging.getLogger(__name__)
 
+# Bus channel suffix and notification type used for live dashboard updates
+DASHBOARD_BUS_CHANNEL = 'crm_activity_dashboard'
+DASHBOARD_BUS_TYPE = 'crm_activity_dashboard/delta'
+
+# Row fields published in a delta, kept to what the list/kanban views render
+DASHBOARD_DELTA_FIELDS = [
+    'activity_id', 'activity_type_id', 'summary', 'date_deadline', 'date_done',
+    'user_id', 'completed_by_user_id', 'lead_id', 'lead_name', 'partner_id',
+    'team_id', 'expected_revenue', 'state', 'priority', 'days_overdue',
+    'activity_color', 'is_active', 'record_source',
+]
+
 
 class CrmActivityDashboard(models.Model):
     _name = 'crm.activity.dashboard'
@@ -95,211 +108,206 @@ class CrmActivityDashboard(models.Model):
             record.state_color_code = color_map.get(record.state, 0)
 
     def init(self):
-        """Create the SQL view for the dashboard"""
+        """Create the SQL view for the dashboard.
+
+        The view reads ``mail_activity_done``, whose model is loaded (and its table
+        created) before this one, see ``models/__init__.py``.
+        """
         tools.drop_view_if_exists(self.env.cr, self._table)
-        
-        # Check if mail_activity_done table exists
-        self.env.cr.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_schema = 'public' 
-                AND table_name = 'mail_activity_done'
-            );
-        """)
-        table_exists = self.env.cr.fetchone()[0]
-        
-        if table_exists:
-            # Full query with UNION when mail_activity_done exists
-            query = '''
-                CREATE OR REPLACE VIEW %s AS (
-                    -- Active activities from mail.activity
-                    SELECT 
-                        ma.id as id,
-                        ma.id as activity_id,
-                        ma.activity_type_id,
-                        ma.summary,
-                        ma.note,
-                        ma.date_deadline,
-                        NULL::date as date_done,
-                        ma.user_id,
-                        NULL::integer as completed_by_user_id,
-                        ma.request_partner_id,
-                        ma.res_id as lead_id,
-                        cl.name as lead_name,
-                        cl.email_from as lead_email,
-                        cl.phone as lead_phone,
-                        cl.partner_id,
-                        cl.stage_id,
-                        cl.team_id,
-                        cl.expected_revenue,
-                        cl.probability,
-                        COALESCE(comp.currency_id, 1) as company_currency,
-                        true as is_active,
-                        cl.type as lead_type,
-                        COALESCE(cl.priority, '1') as priority,
-                        'active'::varchar as record_source,
-                        NULL::text as feedback,
-                        -- Compute state based on date_deadline
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 'overdue'
-                            WHEN ma.date_deadline = CURRENT_DATE THEN 'today'
-                            WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN 'tomorrow'
-                            ELSE 'planned'
-                        END as state,
-                        -- Compute days overdue
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 
-                                (CURRENT_DATE - ma.date_deadline)::integer
-                            ELSE 0
-                        END as days_overdue,
-                        -- Compute activity color based on state and days overdue
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 
-                                CASE 
-                                    WHEN (CURRENT_DATE - ma.date_deadline) > 7 THEN '#d32f2f'
-                                    ELSE '#f44336'
-                                END
-                            WHEN ma.date_deadline = CURRENT_DATE THEN '#ff9800'
-                            WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN '#ffeb3b'
-                            ELSE '#9e9e9e'
-                        END as activity_color,
-                        -- Calendar title (Summary + User)
-                        COALESCE(ma.summary, 'Activity') || ' - ' || COALESCE(up.name, 'Unassigned') as calendar_title,
-                        -- State color code for calendar
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 1  -- Red (overdue)
-                            WHEN ma.date_deadline = CURRENT_DATE THEN 2  -- Yellow (today)
-                            WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN 3  -- Blue (tomorrow)
-                            ELSE 4  -- Gray (planned)
-                        END as state_color_code
-                    FROM mail_activity ma
-                    INNER JOIN crm_lead cl ON ma.res_id = cl.id AND ma.res_model = 'crm.lead'
-                    LEFT JOIN res_company comp ON comp.id = COALESCE(cl.company_id, 1)
-                    LEFT JOIN res_users u ON u.id = ma.user_id
-                    LEFT JOIN res_partner up ON up.id = u.partner_id
-                    WHERE ma.res_model = 'crm.lead'
-                    
-                    UNION ALL
-                    
-                    -- Done activities from mail.activity.done
-                    SELECT 
-                        mad.id + 100000 as id,  -- Offset to avoid ID conflicts
-                        mad.original_activity_id as activity_id,
-                        mad.activity_type_id,
-                        mad.summary,
-                        mad.note,
-                        mad.date_deadline,
-                        mad.date_done,
-                        mad.user_id,
-                        mad.completed_by_user_id,
-                        mad.request_partner_id,
-                        mad.lead_id,
-                        mad.lead_name,
-                        mad.lead_email,
-                        mad.lead_phone,
-                        mad.partner_id,
-                        mad.stage_id,
-                        mad.team_id,
-                        mad.expected_revenue,
-                        mad.probability,
-                        mad.company_currency,
-                        false as is_active,
-                        mad.lead_type,
-                        mad.priority,
-                        'history'::varchar as record_source,
-                        mad.feedback,
-                        'done'::varchar as state,
-                        mad.days_overdue,
-                        '#4caf50'::varchar as activity_color,  -- Green for done
-                        -- Calendar title for done activities
-                        mad.summary || ' - ' || COALESCE(up2.name, 'Unassigned') as calendar_title,
-                        5 as state_color_code  -- Green (done)
-                    FROM mail_activity_done mad
-                    LEFT JOIN res_users u2 ON u2.id = mad.user_id
-                    LEFT JOIN res_partner up2 ON up2.id = u2.partner_id
-                    WHERE mad.lead_id IS NOT NULL
-                )
-            ''' % self._table
-        else:
-            # Simplified query without UNION when mail_activity_done doesn't exist yet
-            query = '''
-                CREATE OR REPLACE VIEW %s AS (
-                    -- Active activities from mail.activity only
-                    SELECT 
-                        ma.id as id,
-                        ma.id as activity_id,
-                        ma.activity_type_id,
-                        ma.summary,
-                        ma.note,
-                        ma.date_deadline,
-                        NULL::date as date_done,
-                        ma.user_id,
-                        NULL::integer as completed_by_user_id,
-                        ma.request_partner_id,
-                        ma.res_id as lead_id,
-                        cl.name as lead_name,
-                        cl.email_from as lead_email,
-                        cl.phone as lead_phone,
-                        cl.partner_id,
-                        cl.stage_id,
-                        cl.team_id,
-                        cl.expected_revenue,
-                        cl.probability,
-                        COALESCE(comp.currency_id, 1) as company_currency,
-                        true as is_active,
-                        cl.type as lead_type,
-                        COALESCE(cl.priority, '1') as priority,
-                        'active'::varchar as record_source,
-                        NULL::text as feedback,
-                        -- Compute state based on date_deadline
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 'overdue'
-                            WHEN ma.date_deadline = CURRENT_DATE THEN 'today'
-                            WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN 'tomorrow'
-                            ELSE 'planned'
-                        END as state,
-                        -- Compute days overdue
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 
-                                (CURRENT_DATE - ma.date_deadline)::integer
-                            ELSE 0
-                        END as days_overdue,
-                        -- Compute activity color based on state and days overdue
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 
-                                CASE 
-                                    WHEN (CURRENT_DATE - ma.date_deadline) > 7 THEN '#d32f2f'
-                                    ELSE '#f44336'
-                                END
-                            WHEN ma.date_deadline = CURRENT_DATE THEN '#ff9800'
-                            WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN '#ffeb3b'
-                            ELSE '#9e9e9e'
-                        END as activity_color,
-                        -- Calendar title (Summary + User)
-                        COALESCE(ma.summary, 'Activity') || ' - ' || COALESCE(up.name, 'Unassigned') as calendar_title,
-                        -- State color code for calendar
-                        CASE 
-                            WHEN ma.date_deadline < CURRENT_DATE THEN 1  -- Red (overdue)
-                            WHEN ma.date_deadline = CURRENT_DATE THEN 2  -- Yellow (today)
-                            WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN 3  -- Blue (tomorrow)
-                            ELSE 4  -- Gray (planned)
-                        END as state_color_code
-                    FROM mail_activity ma
-                    INNER JOIN crm_lead cl ON ma.res_id = cl.id AND ma.res_model = 'crm.lead'
-                    LEFT JOIN res_company comp ON comp.id = COALESCE(cl.company_id, 1)
-                    LEFT JOIN res_users u ON u.id = ma.user_id
-                    LEFT JOIN res_partner up ON up.id = u.partner_id
-                    WHERE ma.res_model = 'crm.lead'
-                )
-            ''' % self._table
-            
+        query = '''
+            CREATE OR REPLACE VIEW %s AS (
+                -- Active activities from mail.activity
+                SELECT 
+                    ma.id as id,
+                    ma.id as activity_id,
+                    ma.activity_type_id,
+                    ma.summary,
+                    ma.note,
+                    ma.date_deadline,
+                    NULL::date as date_done,
+                    ma.user_id,
+                    NULL::integer as completed_by_user_id,
+                    ma.request_partner_id,
+                    ma.res_id as lead_id,
+                    cl.name as lead_name,
+                    cl.email_from as lead_email,
+                    cl.phone as lead_phone,
+                    cl.partner_id,
+                    cl.stage_id,
+                    cl.team_id,
+                    cl.expected_revenue,
+                    cl.probability,
+                    COALESCE(comp.currency_id, 1) as company_currency,
+                    true as is_active,
+                    cl.type as lead_type,
+                    COALESCE(cl.priority, '1') as priority,
+                    'active'::varchar as record_source,
+                    NULL::text as feedback,
+                    -- Compute state based on date_deadline
+                    CASE 
+                        WHEN ma.date_deadline < CURRENT_DATE THEN 'overdue'
+                        WHEN ma.date_deadline = CURRENT_DATE THEN 'today'
+                        WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN 'tomorrow'
+                        ELSE 'planned'
+                    END as state,
+                    -- Compute days overdue
+                    CASE 
+                        WHEN ma.date_deadline < CURRENT_DATE THEN 
+                            (CURRENT_DATE - ma.date_deadline)::integer
+                        ELSE 0
+                    END as days_overdue,
+                    -- Compute activity color based on state and days overdue
+                    CASE 
+                        WHEN ma.date_deadline < CURRENT_DATE THEN 
+                            CASE 
+                                WHEN (CURRENT_DATE - ma.date_deadline) > 7 THEN '#d32f2f'
+                                ELSE '#f44336'
+                            END
+                        WHEN ma.date_deadline = CURRENT_DATE THEN '#ff9800'
+                        WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN '#ffeb3b'
+                        ELSE '#9e9e9e'
+                    END as activity_color,
+                    -- Calendar title (Summary + User)
+                    COALESCE(ma.summary, 'Activity') || ' - ' || COALESCE(up.name, 'Unassigned') as calendar_title,
+                    -- State color code for calendar
+                    CASE 
+                        WHEN ma.date_deadline < CURRENT_DATE THEN 1  -- Red (overdue)
+                        WHEN ma.date_deadline = CURRENT_DATE THEN 2  -- Yellow (today)
+                        WHEN ma.date_deadline = CURRENT_DATE + INTERVAL '1 day' THEN 3  -- Blue (tomorrow)
+                        ELSE 4  -- Gray (planned)
+                    END as state_color_code
+                FROM mail_activity ma
+                INNER JOIN crm_lead cl ON ma.res_id = cl.id AND ma.res_model = 'crm.lead'
+                LEFT JOIN res_company comp ON comp.id = COALESCE(cl.company_id, 1)
+                LEFT JOIN res_users u ON u.id = ma.user_id
+                LEFT JOIN res_partner up ON up.id = u.partner_id
+                WHERE ma.res_model = 'crm.lead'
+                
+                UNION ALL
+                
+                -- Done activities from mail.activity.done
+                SELECT 
+                    mad.id + 100000 as id,  -- Offset to avoid ID conflicts
+                    mad.original_activity_id as activity_id,
+                    mad.activity_type_id,
+                    mad.summary,
+                    mad.note,
+                    mad.date_deadline,
+                    mad.date_done,
+                    mad.user_id,
+                    mad.completed_by_user_id,
+                    mad.request_partner_id,
+                    mad.lead_id,
+                    mad.lead_name,
+                    mad.lead_email,
+                    mad.lead_phone,
+                    mad.partner_id,
+                    mad.stage_id,
+                    mad.team_id,
+                    mad.expected_revenue,
+                    mad.probability,
+                    mad.company_currency,
+                    false as is_active,
+                    mad.lead_type,
+                    mad.priority,
+                    'history'::varchar as record_source,
+                    mad.feedback,
+                    'done'::varchar as state,
+                    mad.days_overdue,
+                    '#4caf50'::varchar as activity_color,  -- Green for done
+                    -- Calendar title for done activities
+                    mad.summary || ' - ' || COALESCE(up2.name, 'Unassigned') as calendar_title,
+                    5 as state_color_code  -- Green (done)
+                FROM mail_activity_done mad
+                LEFT JOIN res_users u2 ON u2.id = mad.user_id
+                LEFT JOIN res_partner up2 ON up2.id = u2.partner_id
+                WHERE mad.lead_id IS NOT NULL
+            )
+        ''' % self._table
+
         self.env.cr.execute(query)
 
     @api.model
-    def search_read(self, domain=None, fields=None, offset=0, limit=None, order=None):
-        """Override search_read to refresh the view data"""
-        self.init()
-        return super().search_read(domain, fields, offset, limit, order)
+    def _get_bus_channels(self, user_id):
+        """Bus channels on which a dashboard row is published.
+
+        The assigned user sees the row through their own channel. Managers can read
+        every row, so all rows are also published on the managers' group channel.
+        """
+        channels = [(self.env.ref('peepl_crm_activity_dashboard.group_crm_activity_dashboard_manager'),
+                     DASHBOARD_BUS_CHANNEL)]
+        if user_id:
+            channels.append((self.env['res.users'].browse(user_id), DASHBOARD_BUS_CHANNEL))
+        return channels
+
+    @api.model
+    def _get_row_snapshot(self, row_ids):
+        """Map dashboard row ids to their current (user_id, team_id, state)"""
+        if not row_ids:
+            return {}
+        self.env.flush_all()
+        self.env.cr.execute(
+            "SELECT id, user_id, team_id, state FROM %s WHERE id IN %%s" % self._table,
+            (tuple(row_ids),)
+        )
+        return {row_id: (user_id, team_id, state) for row_id, user_id, team_id, state in self.env.cr.fetchall()}
+
+    @api.model
+    def _handle_row_changes(self, row_ids, previous_rows=None):
+        """Propagate changed dashboard rows to the KPI counters and the bus.
+
+        ``previous_rows`` is the snapshot taken with ``_get_row_snapshot`` before
+        the change; rows it contains that have left the view count as removed.
+        """
+        previous_rows = previous_rows or {}
+        row_ids = set(row_ids or []) | set(previous_rows)
+        if not row_ids:
+            return
+        self.env.flush_all()
+        rows = self.sudo().search_read([('id', 'in', list(row_ids))], DASHBOARD_DELTA_FIELDS)
+        current_rows = {
+            row['id']: (row['user_id'] and row['user_id'][0], row['team_id'] and row['team_id'][0], row['state'])
+            for row in rows
+        }
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env['crm.activity.kpi']._apply_row_changes(previous_rows, current_rows)
+        except psycopg2.extensions.TransactionRollbackError:
+            # Concurrency errors are retried by the caller, the counters must not
+            # silently miss this change
+            raise
+        except Exception as e:
+            # Log error but don't break the activity operation
+            _logger.error(f"Failed to update KPI counters for dashboard rows {sorted(row_ids)}: {e}")
+        self._notify_dashboard_delta(rows, row_ids - set(current_rows), previous_rows)
+
+    @api.model
+    def _notify_dashboard_delta(self, rows, removed_ids, previous_rows):
+        """Publish changed rows as a compact delta.
+
+        Rows still present in the view are sent as upserts, rows that have
+        disappeared are sent as removals. Users the row was published to before
+        the change are notified as well, so that they drop it.
+        """
+        try:
+            deltas = {}
+            for row in rows:
+                channels = set(self._get_bus_channels(row['user_id'] and row['user_id'][0]))
+                if row['id'] in previous_rows:
+                    channels.update(self._get_bus_channels(previous_rows[row['id']][0]))
+                for channel in channels:
+                    deltas.setdefault(channel, {'upsert': [], 'remove': []})['upsert'].append(row)
+            for row_id in removed_ids:
+                for channel in self._get_bus_channels(previous_rows[row_id][0]):
+                    deltas.setdefault(channel, {'upsert': [], 'remove': []})['remove'].append(row_id)
+            if deltas:
+                self.env['bus.bus']._sendmany([
+                    (channel, DASHBOARD_BUS_TYPE, delta)
+                    for channel, delta in deltas.items()
+                ])
+        except Exception as e:
+            # Log error but don't break the activity operation
+            _logger.warning(f"Failed to publish dashboard delta: {e}")
 
     @api.model
     def _refresh_dashboard_view(self):
@@ -390,6 +398,35 @@ class CrmActivityDashboard(models.Model):
             }
         }
 
+    def action_mark_done_dashboard_bulk(self):
+        """Action to mark several activities as done at once - opens wizard for shared feedback"""
+        active_rows = self.filtered(lambda r: r.record_source == 'active')
+        if not active_rows:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Warning',
+                    'message': 'The selected activities are already completed.',
+                    'type': 'warning',
+                }
+            }
+        if len(active_rows) == 1:
+            return active_rows.action_mark_done_dashboard()
+        
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Mark Activities as Done',
+            'res_model': 'activity.mark.done.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'active_ids': active_rows.ids,
+                'active_model': self._name,
+                'form_view_ref': 'peepl_crm_activity_dashboard.view_activity_mark_done_wizard_form',
+            }
+        }
+
     def action_schedule_next(self):
         """Action to schedule next activity"""
         self.ensure_one()
@@ -464,90 +501,80 @@ class CrmActivityDashboard(models.Model):
 class MailActivity(models.Model):
     _inherit = 'mail.activity'
 
-    @api.model
-    def create(self, vals):
-        """Override create to refresh dashboard view and notify users"""
-        result = super().create(vals)
-        
-        # Refresh dashboard for CRM activities
-        if vals.get('res_model') == 'crm.lead':
-            self._refresh_dashboard_view()
-        
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to publish new CRM activities to the dashboard"""
+        result = super().create(vals_list)
+
+        crm_activities = result.filtered(lambda x: x.res_model == 'crm.lead')
+        if crm_activities:
+            self.env['crm.activity.dashboard']._handle_row_changes(crm_activities.ids)
+
         return result
 
+    def _action_done(self, feedback=False, attachment_ids=None):
+        """Snapshot completed CRM activities into the dashboard history in one batch.
+
+        Covers action_done, action_feedback and the schedule-next chains. Callers
+        that already created the done records set ``skip_activity_done_snapshot``.
+        """
+        crm_activities = self.filtered(lambda x: x.res_model == 'crm.lead')
+        if crm_activities and not self.env.context.get('skip_activity_done_snapshot'):
+            try:
+                with self.env.cr.savepoint():
+                    self.env['mail.activity.done'].sudo().create_from_activities(
+                        crm_activities, feedback=feedback, attachment_ids=attachment_ids)
+            except Exception as e:
+                # Log error but don't break the activity operation
+                _logger.error(f"Failed to create done activities from {crm_activities.ids}: {e}")
+        return super()._action_done(feedback=feedback, attachment_ids=attachment_ids)
+
     def write(self, vals):
-        """Override write to refresh dashboard view and notify users"""
+        """Override write to publish updated CRM activities to the dashboard"""
         crm_activities = self.filtered(lambda x: x.res_model == 'crm.lead')
+        dashboard = self.env['crm.activity.dashboard']
+        previous_rows = dashboard._get_row_snapshot(crm_activities.ids)
+
         result = super().write(vals)
-        
+
         if crm_activities:
-            self._refresh_dashboard_view()
-        
+            dashboard._handle_row_changes(crm_activities.ids, previous_rows)
+
         return result
 
     def unlink(self):
-        """Override unlink to refresh dashboard view and notify users"""
+        """Override unlink to remove CRM activities from the dashboard"""
         crm_activities = self.filtered(lambda x: x.res_model == 'crm.lead')
-        
+        dashboard = self.env['crm.activity.dashboard']
+        previous_rows = dashboard._get_row_snapshot(crm_activities.ids)
+
         result = super().unlink()
-        
-        if crm_activities:
-            self._refresh_dashboard_view()
-        
-        return result
 
-    def action_done(self):
-        """Override action_done to refresh dashboard immediately"""
-        crm_activities = self.filtered(lambda x: x.res_model == 'crm.lead')
-        result = super().action_done()
-        
-        if crm_activities:
-            self._refresh_dashboard_view()
-        
-        return result
+        if previous_rows:
+            dashboard._handle_row_changes([], previous_rows)
 
-    def action_feedback_schedule_next(self):
-        """Override action_feedback_schedule_next to refresh dashboard"""
-        crm_activities = self.filtered(lambda x: x.res_model == 'crm.lead')
-        result = super().action_feedback_schedule_next()
-        
-        if crm_activities:
-            self._refresh_dashboard_view()
-        
         return result
 
-    def _refresh_dashboard_view(self):
-        """Refresh the dashboard SQL view"""
-        try:
-            self.env['crm.activity.dashboard']._refresh_dashboard_view()
-        except Exception as e:
-            # Log error but don't break the activity operation
-            _logger.warning(f"Failed to refresh dashboard view: {e}")
-
 
 class CrmLead(models.Model):
     _inherit = 'crm.lead'
 
-    @api.model
-    def create(self, vals):
-        """Override create to refresh dashboard when lead is created"""
-        result = super().create(vals)
-        
-        # If lead has activities, refresh dashboard
-        if result.activity_ids:
-            self.env['crm.activity.dashboard']._refresh_dashboard_view()
-        
-        return result
-
     def write(self, vals):
-        """Override write to refresh dashboard when lead is updated"""
-        result = super().write(vals)
-        
-        # If lead information that affects dashboard is updated, refresh
-        dashboard_fields = ['name', 'email_from', 'phone', 'partner_id', 
+        """Override write to publish lead changes shown on the dashboard"""
+        # If lead information that affects dashboard is updated, publish the rows
+        dashboard_fields = ['name', 'email_from', 'phone', 'partner_id',
                           'stage_id', 'team_id', 'expected_revenue', 'probability', 'type']
-        
-        if any(field in vals for field in dashboard_fields) and self.activity_ids:
-            self.env['crm.activity.dashboard']._refresh_dashboard_view()
-        
-        return result
\ No newline at end of file
+
+        if not any(field in vals for field in dashboard_fields):
+            return super().write(vals)
+
+        dashboard = self.env['crm.activity.dashboard']
+        row_ids = dashboard.sudo().search([('lead_id', 'in', self.ids), ('is_active', '=', True)]).ids
+        previous_rows = dashboard._get_row_snapshot(row_ids)
+
+        result = super().write(vals)
+
+        if row_ids:
+            dashboard._handle_row_changes(row_ids, previous_rows)
+
+        return result
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+from odoo import models, fields, api
+from collections import defaultdict
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Dashboard state -> counter column
+KPI_STATE_COLUMNS = {
+    'overdue': 'overdue_count',
+    'today': 'today_count',
+    'tomorrow': 'tomorrow_count',
+    'planned': 'planned_count',
+    'done': 'done_count',
+}
+
+# Advisory lock serializing the rebuilds of the counters
+KPI_REBUILD_LOCK = 8142701
+
+
+class CrmActivityKpi(models.Model):
+    _name = 'crm.activity.kpi'
+    _description = 'CRM Activity KPI Counters'
+    _order = 'date desc, user_id, team_id'
+
+    date = fields.Date('Date', required=True, readonly=True, index=True,
+                       help='Day for which the overdue/today/tomorrow/planned split is valid')
+    user_id = fields.Many2one('res.users', string='Assigned to', readonly=True, index=True, ondelete='cascade')
+    team_id = fields.Many2one('crm.team', string='Sales Team', readonly=True, index=True, ondelete='cascade')
+    overdue_count = fields.Integer('Overdue', readonly=True)
+    today_count = fields.Integer('Today', readonly=True)
+    tomorrow_count = fields.Integer('Tomorrow', readonly=True)
+    planned_count = fields.Integer('Planned', readonly=True)
+    done_count = fields.Integer('Done', readonly=True)
+
+    # Counter rows are additive: a rebuild inserts the totals per user and team,
+    # each transaction changing dashboard rows then inserts its own differences.
+    # The counters of a user or team are the sum of their rows.
+
+    @api.model
+    def _rebuild_counters(self):
+        """Replace all the counter rows by today's totals from the dashboard view.
+
+        The purge and the aggregate run in one statement, hence on one snapshot:
+        the rows of a transaction committed after that snapshot are neither
+        deleted nor counted, they remain valid on top of the new totals.
+        """
+        self.env.flush_all()
+        self.env.cr.execute("""
+            WITH purged AS (
+                DELETE FROM crm_activity_kpi
+            )
+            INSERT INTO crm_activity_kpi (
+                date, user_id, team_id,
+                overdue_count, today_count, tomorrow_count, planned_count, done_count,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT
+                CURRENT_DATE, user_id, team_id,
+                COUNT(*) FILTER (WHERE state = 'overdue'),
+                COUNT(*) FILTER (WHERE state = 'today'),
+                COUNT(*) FILTER (WHERE state = 'tomorrow'),
+                COUNT(*) FILTER (WHERE state = 'planned'),
+                COUNT(*) FILTER (WHERE state = 'done'),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM crm_activity_dashboard
+            GROUP BY user_id, team_id
+        """, {'uid': self.env.uid})
+        _logger.info(f"Rebuilt CRM activity KPI counters ({self.env.cr.rowcount} rows)")
+        self.invalidate_model()
+
+    @api.model
+    def _rebuild_counters_in_new_transaction(self, force=False):
+        """Rebuild the counters from committed data, in a transaction of their own.
+
+        Rebuilds are serialized by an advisory lock. The transaction runs in READ
+        COMMITTED so that, once the lock is acquired, a rebuild committed meanwhile
+        is seen and not done twice. Unless ``force``, nothing is done when today's
+        counters already exist.
+        """
+        with self.pool.cursor() as cr:
+            if not self.pool.in_test_mode():
+                cr.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            cr.execute("SELECT pg_advisory_xact_lock(%s)", (KPI_REBUILD_LOCK,))
+            kpi = self.with_env(self.env(cr=cr))
+            if force or not kpi._has_today_counters():
+                kpi._rebuild_counters()
+
+    @api.model
+    def _has_today_counters(self):
+        """Whether the counters have been rebuilt today.
+
+        Rows dated today are only inserted once today's rebuild is committed
+        (see ``_apply_row_changes``).
+        """
+        self.env.cr.execute("SELECT 1 FROM crm_activity_kpi WHERE date = CURRENT_DATE LIMIT 1")
+        return bool(self.env.cr.fetchone())
+
+    @api.model
+    def _cron_rollover_counters(self):
+        """Daily cron: "today" and "overdue" depend on the current date"""
+        self._rebuild_counters_in_new_transaction(force=True)
+
+    @api.model
+    def _apply_row_changes(self, previous_rows, current_rows):
+        """Insert the difference between two dashboard row snapshots.
+
+        Both snapshots map dashboard row ids to ``(user_id, team_id, state)``.
+        The differences are inserted as new rows in the current transaction: no
+        counter row is locked or updated, and they are rolled back together with
+        the savepoint or transaction that made the dashboard change.
+        """
+        deltas = defaultdict(lambda: dict.fromkeys(KPI_STATE_COLUMNS.values(), 0))
+        for rows, sign in ((previous_rows, -1), (current_rows, 1)):
+            for user_id, team_id, state in rows.values():
+                if state in KPI_STATE_COLUMNS:
+                    deltas[(user_id or None, team_id or None)][KPI_STATE_COLUMNS[state]] += sign
+        deltas = {key: delta for key, delta in deltas.items() if any(delta.values())}
+        if not deltas:
+            return
+        if not self._has_today_counters():
+            # The rebuild does not see the uncommitted changes of this
+            # transaction, the differences below are still to be added
+            self._rebuild_counters_in_new_transaction()
+
+        columns = list(KPI_STATE_COLUMNS.values())
+        params = []
+        for (user_id, team_id), delta in deltas.items():
+            params += [user_id, team_id, *(delta[column] for column in columns), self.env.uid, self.env.uid]
+        row_template = "(CURRENT_DATE, %s, %s, {counts}, %s, NOW() AT TIME ZONE 'UTC', %s, NOW() AT TIME ZONE 'UTC')".format(
+            counts=', '.join(['%s'] * len(columns)))
+        self.env.cr.execute("""
+            INSERT INTO crm_activity_kpi (
+                date, user_id, team_id, {columns},
+                create_uid, create_date, write_uid, write_date
+            )
+            VALUES {rows}
+        """.format(columns=', '.join(columns), rows=', '.join([row_template] * len(deltas))), params)
+
+    @api.model
+    def get_activity_counters(self):
+        """Counters for the dashboard header and systray badges.
+
+        Returns the totals of the current user and of each of their sales teams.
+        """
+        if self._has_today_counters():
+            return self._read_activity_counters()
+        self._rebuild_counters_in_new_transaction()
+        # The snapshot of this transaction may predate the rebuild
+        with self.pool.cursor() as cr:
+            return self.with_env(self.env(cr=cr))._read_activity_counters()
+
+    @api.model
+    def _read_activity_counters(self):
+        """Sum the counter rows of the current user and of their sales teams.
+
+        Every row counts, including the differences inserted by transactions
+        that started before the last rebuild (see ``_rebuild_counters``).
+        """
+        user = self.env.user
+        columns = list(KPI_STATE_COLUMNS.values())
+        self.env.cr.execute("""
+            SELECT user_id, team_id, %s
+            FROM crm_activity_kpi
+            WHERE user_id = %%s OR team_id IN %%s
+        """ % ', '.join(columns), (user.id, tuple(user.crm_team_ids.ids) or (0,)))
+        result = {
+            'user': dict.fromkeys(columns, 0),
+            'teams': {team_id: dict.fromkeys(columns, 0) for team_id in user.crm_team_ids.ids},
+        }
+        for row in self.env.cr.fetchall():
+            user_id, team_id, counts = row[0], row[1], dict(zip(columns, row[2:]))
+            if user_id == user.id:
+                for column, count in counts.items():
+                    result['user'][column] += count
+            if team_id in result['teams']:
+                for column, count in counts.items():
+                    result['teams'][team_id][column] += count
+        return result
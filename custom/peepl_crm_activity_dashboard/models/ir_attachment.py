@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+# Attachment values copied as such by ir.attachment.create()
+SHARED_CONTENT_FIELDS = ['name', 'type', 'mimetype', 'index_content']
+
+# Columns locating the filestore blob, ignored by ir.attachment.create() and write()
+SHARED_BLOB_FIELDS = ['store_fname', 'checksum', 'file_size']
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    def _copy_shared_content(self, default=None, name_prefix=''):
+        """Duplicate attachments while reusing their filestore blob.
+
+        Unlike ``copy()`` the file content is neither read nor re-hashed: the new
+        rows are created without content, then pointed to the same ``store_fname``
+        with one UPDATE, since ``create()`` drops the blob columns. The filestore
+        garbage collector only removes a blob once no attachment references it, so
+        deleting either the original or the copy stays safe. Attachments stored in
+        database fall back to a regular copy.
+        """
+        filestore_attachments = self.filtered('store_fname')
+        vals_list = []
+        for vals in filestore_attachments.read(SHARED_CONTENT_FIELDS, load=None):
+            vals.pop('id')
+            vals.update(default or {})
+            vals['name'] = f"{name_prefix}{vals['name']}"
+            vals_list.append(vals)
+        copies = self.create(vals_list)
+        if copies:
+            self.env.cr.execute("""
+                UPDATE ir_attachment AS copy
+                SET store_fname = src.store_fname,
+                    checksum = src.checksum,
+                    file_size = src.file_size
+                FROM (SELECT unnest(%s) AS copy_id, unnest(%s) AS src_id) AS pairs
+                JOIN ir_attachment AS src ON src.id = pairs.src_id
+                WHERE copy.id = pairs.copy_id
+            """, (copies.ids, filestore_attachments.ids))
+            copies.invalidate_recordset(SHARED_BLOB_FIELDS + ['raw', 'datas', 'db_datas'])
+        for attachment in self - filestore_attachments:
+            attachment_default = dict(default or {})
+            if name_prefix:
+                attachment_default['name'] = f"{name_prefix}{attachment.name}"
+            copies |= attachment.copy(attachment_default)
+        return copies
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+from .crm_activity_dashboard import DASHBOARD_BUS_CHANNEL
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Subscribe dashboard users to their own delta channel, and managers to the
+        channel on which every row is published"""
+        if self.env.uid and self.env.user.has_group(
+                'peepl_crm_activity_dashboard.group_crm_activity_dashboard_user'):
+            channels = list(channels)
+            manager_group = self.env.ref('peepl_crm_activity_dashboard.group_crm_activity_dashboard_manager')
+            if manager_group in self.env.user.groups_id:
+                # Managers can see the rows of all users, including their own
+                channels.append((manager_group, DASHBOARD_BUS_CHANNEL))
+            else:
+                channels.append((self.env.user, DASHBOARD_BUS_CHANNEL))
+        return super()._build_bus_channel_list(channels)
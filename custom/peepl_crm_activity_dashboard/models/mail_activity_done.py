@@ -88,93 +88,150 @@ class MailActivityDone(models.Model):
         if not activity or activity.res_model != 'crm.lead':
             _logger.warning(f"Invalid activity for done record: {activity}")
             return False
-        
-        # Ensure we have a valid lead
-        lead = self.env['crm.lead'].browse(activity.res_id)
-        if not lead.exists():
-            _logger.warning(f"Lead {activity.res_id} not found for activity {activity.id}")
-            return False
             
         try:
-            # Prepare values for the done activity record
-            vals = {
+            done_activity = self.create_from_activities(
+                activity, feedback=feedback, attachment_ids=attachment_ids)
+            if not done_activity:
+                _logger.warning(f"Lead {activity.res_id} not found for activity {activity.id}")
+                return False
+            return done_activity
+                
+        except Exception as e:
+            _logger.error(f"Failed to create done activity from {activity.id}: {e}")
+            # Log the full traceback for debugging
+            import traceback
+            _logger.error(f"Full traceback: {traceback.format_exc()}")
+            return False
+
+    @api.model
+    def create_from_activities(self, activities, feedback=None, attachment_ids=None):
+        """Create done activity records for several mail.activity in one batch.
+
+        Lead data is snapshotted with a single read and all done records are
+        created with a single create. Activities not linked to an existing lead
+        are skipped.
+        """
+        activities = activities.filtered(lambda a: a.res_model == 'crm.lead')
+        if not activities:
+            return self.browse()
+
+        # Store lead data directly to avoid related field issues
+        leads = self.env['crm.lead'].browse(set(activities.mapped('res_id'))).exists()
+        lead_data = {
+            lead['id']: lead
+            for lead in leads.read(self._get_lead_snapshot_fields(), load=None)
+        }
+
+        date_done = fields.Date.context_today(self)
+        vals_list = []
+        for activity in activities:
+            lead = lead_data.get(activity.res_id)
+            if not lead:
+                continue
+            vals_list.append({
                 'activity_type_id': activity.activity_type_id.id,
                 'summary': activity.summary or activity.activity_type_id.name,
                 'note': activity.note or False,
                 'date_deadline': activity.date_deadline,
-                'date_done': fields.Date.context_today(self),
+                'date_done': date_done,
                 'user_id': activity.user_id.id,
                 'completed_by_user_id': self.env.user.id,
-                'request_partner_id': activity.request_partner_id.id if activity.request_partner_id else False,
+                'request_partner_id': activity.request_partner_id.id,
                 'priority': '1',  # Default priority since mail.activity might not have this field
-                'lead_id': lead.id,  # Pass the lead record ID, not activity.res_id
+                'lead_id': lead['id'],
                 'feedback': feedback or False,
                 'original_activity_id': activity.id,
-                
-                # Store lead data directly to avoid related field issues
-                'lead_name': lead.name,
-                'lead_email': lead.email_from,
-                'lead_phone': lead.phone,
-                'partner_id': lead.partner_id.id if lead.partner_id else False,
-                'stage_id': lead.stage_id.id if lead.stage_id else False,
-                'team_id': lead.team_id.id if lead.team_id else False,
-                'expected_revenue': lead.expected_revenue,
-                'probability': lead.probability,
-                'company_currency': lead.company_currency.id if lead.company_currency else False,
-                'lead_type': lead.type,
-            }
-            
-            # Create the done activity record
-            done_activity = self.create(vals)
-            
-            # Link attachments if provided
-            if attachment_ids:
-                # Ensure attachments are valid and exist
-                valid_attachments = self.env['ir.attachment'].browse(attachment_ids).exists()
-                if valid_attachments:
-                    # Create copies of attachments for the done activity
-                    done_attachments = []
-                    for attachment in valid_attachments:
-                        try:
-                            done_attachment = attachment.copy({
-                                'res_model': 'mail.activity.done',
-                                'res_id': done_activity.id,
-                                'name': f"[DONE] {attachment.name}",
-                            })
-                            done_attachments.append(done_attachment.id)
-                        except Exception as e:
-                            _logger.warning(f"Failed to copy attachment {attachment.id}: {e}")
-                    
-                    if done_attachments:
-                        done_activity.attachment_ids = [(6, 0, done_attachments)]
-            
-            _logger.info(f"Successfully created done activity {done_activity.id} from activity {activity.id}")
-            return done_activity
-                
-        except Exception as e:
-            _logger.error(f"Failed to create done activity from {activity.id}: {e}")
-            # Log the full traceback for debugging
-            import traceback
-            _logger.error(f"Full traceback: {traceback.format_exc()}")
-            return False
+                'lead_name': lead['name'],
+                'lead_email': lead['email_from'],
+                'lead_phone': lead['phone'],
+                'partner_id': lead['partner_id'],
+                'stage_id': lead['stage_id'],
+                'team_id': lead['team_id'],
+                'expected_revenue': lead['expected_revenue'],
+                'probability': lead['probability'],
+                'company_currency': lead['company_currency'],
+                'lead_type': lead['type'],
+            })
+        done_activities = self.create(vals_list)
+
+        # Link attachments if provided
+        if attachment_ids and done_activities:
+            # Ensure attachments are valid and exist
+            valid_attachments = self.env['ir.attachment'].browse(attachment_ids).exists()
+            for done_activity in done_activities if valid_attachments else []:
+                # Reference the uploaded files without duplicating their content, one call per record
+                try:
+                    with self.env.cr.savepoint():
+                        done_attachments = valid_attachments._copy_shared_content({
+                            'res_model': 'mail.activity.done',
+                            'res_id': done_activity.id,
+                        }, name_prefix="[DONE] ")
+                except Exception as e:
+                    _logger.warning(f"Failed to copy attachments {valid_attachments.ids}: {e}")
+                    continue
+                done_activity.attachment_ids = [(6, 0, done_attachments.ids)]
+
+        _logger.info(f"Successfully created {len(done_activities)} done activities from activities {activities.ids}")
+        return done_activities
+
+    @api.model
+    def _get_lead_snapshot_fields(self):
+        """crm.lead fields copied onto the done activity record"""
+        return [
+            'name', 'email_from', 'phone', 'partner_id', 'stage_id', 'team_id',
+            'expected_revenue', 'probability', 'company_currency', 'type',
+        ]
 
     @api.model
-    def create(self, vals):
+    def mark_activities_done(self, activities, feedback=None, attachment_ids=None):
+        """Mark several CRM activities as done at once.
+
+        Snapshots the activities into done records, then completes the originals
+        with a single action_feedback call, which posts the chatter messages and
+        unlinks them in one go. Returns the created done records.
+        """
+        activities = activities.exists().filtered(lambda a: a.res_model == 'crm.lead')
+        done_activities = self.create_from_activities(
+            activities, feedback=feedback, attachment_ids=attachment_ids)
+        if activities:
+            # The chatter messages get their own copies of the files, as in the single wizard
+            message_attachments = self.env['ir.attachment']
+            valid_attachments = self.env['ir.attachment'].browse(attachment_ids or []).exists()
+            if valid_attachments:
+                try:
+                    with self.env.cr.savepoint():
+                        message_attachments = valid_attachments._copy_shared_content({
+                            'res_model': 'mail.message',
+                            'res_id': 0,
+                        })
+                except Exception as e:
+                    _logger.warning(f"Failed to copy attachments {valid_attachments.ids}: {e}")
+            activities.with_context(skip_activity_done_snapshot=True).action_feedback(
+                feedback=feedback, attachment_ids=message_attachments.ids)
+        return done_activities
+
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create to add validation and logging"""
         # Validate required fields
-        if not vals.get('lead_id'):
-            raise ValueError("Lead ID is required for done activity")
-        
-        if not vals.get('activity_type_id'):
-            raise ValueError("Activity type is required for done activity")
+        for vals in vals_list:
+            if not vals.get('lead_id'):
+                raise ValueError("Lead ID is required for done activity")
+            
+            if not vals.get('activity_type_id'):
+                raise ValueError("Activity type is required for done activity")
         
-        # Ensure lead exists
-        lead = self.env['crm.lead'].browse(vals['lead_id'])
-        if not lead.exists():
-            raise ValueError(f"Lead with ID {vals['lead_id']} does not exist")
+        # Ensure leads exist
+        lead_ids = {vals['lead_id'] for vals in vals_list}
+        missing_lead_ids = lead_ids - set(self.env['crm.lead'].browse(lead_ids).exists().ids)
+        if missing_lead_ids:
+            raise ValueError(f"Lead with ID {', '.join(map(str, missing_lead_ids))} does not exist")
         
-        result = super().create(vals)
-        _logger.info(f"Created done activity record {result.id} for lead {vals.get('lead_id')}")
+        result = super().create(vals_list)
+        _logger.info(f"Created done activity records {result.ids} for leads {list(lead_ids)}")
+        # Done activities appear in the dashboard with an id offset
+        self.env['crm.activity.dashboard']._handle_row_changes([record_id + 100000 for record_id in result.ids])
         return result
 
     def action_open_lead(self):
@@ -218,4 +275,9 @@ class MailActivityDone(models.Model):
         """Override unlink to log deletions"""
         for record in self:
             _logger.info(f"Deleting done activity {record.id} - {record.summary}")
-        return super().unlink()
\ No newline at end of file
+        dashboard = self.env['crm.activity.dashboard']
+        previous_rows = dashboard._get_row_snapshot([record_id + 100000 for record_id in self.ids])
+        result = super().unlink()
+        if previous_rows:
+            dashboard._handle_row_changes([], previous_rows)
+        return result
\ No newline at end of file
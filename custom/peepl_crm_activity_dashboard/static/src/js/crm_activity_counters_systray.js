@@ -0,0 +1,58 @@
+/** @odoo-module **/
+
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { debounce } from "@web/core/utils/timing";
+import { Component, onWillStart, onWillUnmount, useState } from "@odoo/owl";
+import { DASHBOARD_DELTA_TYPE } from "./crm_activity_dashboard_bus";
+
+/**
+ * Systray badges with the overdue and today activities of the current user.
+ * Counters are read from the KPI table and refreshed when a dashboard delta
+ * is received on the bus.
+ */
+export class CrmActivityCountersSystray extends Component {
+    setup() {
+        this.orm = useService("orm");
+        this.actionService = useService("action");
+        this.userService = useService("user");
+        const busService = useService("bus_service");
+        this.state = useState({ visible: false, counters: {} });
+        const refresh = debounce(() => this.loadCounters(), 2000);
+        const onNotification = ({ detail: notifications }) => {
+            if (this.state.visible && notifications.some(({ type }) => type === DASHBOARD_DELTA_TYPE)) {
+                refresh();
+            }
+        };
+        onWillStart(async () => {
+            this.state.visible = await this.userService.hasGroup(
+                "peepl_crm_activity_dashboard.group_crm_activity_dashboard_user"
+            );
+            if (this.state.visible) {
+                await this.loadCounters();
+            }
+        });
+        busService.addEventListener("notification", onNotification);
+        onWillUnmount(() => {
+            busService.removeEventListener("notification", onNotification);
+        });
+    }
+
+    async loadCounters() {
+        const counters = await this.orm.call("crm.activity.kpi", "get_activity_counters", []);
+        this.state.counters = counters.user;
+    }
+
+    openOverdue() {
+        this.actionService.doAction("peepl_crm_activity_dashboard.action_crm_activity_dashboard_overdue");
+    }
+
+    openToday() {
+        this.actionService.doAction("peepl_crm_activity_dashboard.action_crm_activity_dashboard_today");
+    }
+}
+CrmActivityCountersSystray.template = "peepl_crm_activity_dashboard.CrmActivityCountersSystray";
+
+registry.category("systray").add("peepl_crm_activity_dashboard.counters", {
+    Component: CrmActivityCountersSystray,
+}, { sequence: 30 });
@@ -0,0 +1,124 @@
+/** @odoo-module **/
+
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { debounce } from "@web/core/utils/timing";
+import { onWillUnmount } from "@odoo/owl";
+import { listView } from "@web/views/list/list_view";
+import { ListController } from "@web/views/list/list_controller";
+import { kanbanView } from "@web/views/kanban/kanban_view";
+import { KanbanController } from "@web/views/kanban/kanban_controller";
+
+export const DASHBOARD_DELTA_TYPE = "crm_activity_dashboard/delta";
+
+/**
+ * Comparable value of a field as returned by the server (many2one as [id, name])
+ */
+function groupKey(value) {
+    return Array.isArray(value) ? value[0] : value;
+}
+
+/**
+ * Apply a delta published by the server to the loaded records.
+ * Rows already displayed are patched in place (inside their group when the
+ * view is grouped) and removed rows are dropped. Only rows the view does not
+ * know yet, or rows moving to another group, require a (debounced) reload.
+ */
+function applyDashboardDelta(model, delta, reload) {
+    const root = model.root;
+    const upsert = delta.upsert || [];
+    const remove = delta.remove || [];
+    // Loaded records with the list holding them and its group (if any)
+    const entries = new Map();
+    let groupByField = null;
+    if (root.isGrouped) {
+        groupByField = root.groupBy[0].split(":")[0];
+        for (const group of root.groups) {
+            for (const record of group.list.records) {
+                entries.set(record.resId, { record, list: group.list, group });
+            }
+        }
+    } else {
+        for (const record of root.records) {
+            entries.set(record.resId, { record, list: root, group: null });
+        }
+    }
+    let changed = false;
+    let needsReload = false;
+    for (const rowId of remove) {
+        const entry = entries.get(rowId);
+        if (entry) {
+            entry.list.records.splice(entry.list.records.indexOf(entry.record), 1);
+            entry.list.count--;
+            if (entry.group) {
+                entry.group.count--;
+            }
+            changed = true;
+        }
+    }
+    for (const row of upsert) {
+        const entry = entries.get(row.id);
+        if (!entry) {
+            needsReload = true;
+            continue;
+        }
+        const values = entry.record._parseServerValues(row);
+        if (groupByField && groupByField in values &&
+                groupKey(row[groupByField]) !== groupKey(entry.record.data[groupByField])) {
+            // The row moves to another group (e.g. another state column)
+            needsReload = true;
+            continue;
+        }
+        Object.assign(entry.record._values, values);
+        Object.assign(entry.record.data, values);
+        changed = true;
+    }
+    if (needsReload) {
+        reload();
+    } else if (changed) {
+        model.notify();
+    }
+}
+
+/**
+ * Listen to dashboard deltas on the bus for the lifetime of the controller
+ */
+function useDashboardDeltas(model) {
+    const busService = useService("bus_service");
+    const reload = debounce(() => model.load(), 1000);
+    const onNotification = ({ detail: notifications }) => {
+        for (const { type, payload } of notifications) {
+            if (type === DASHBOARD_DELTA_TYPE) {
+                applyDashboardDelta(model, payload, reload);
+            }
+        }
+    };
+    busService.addEventListener("notification", onNotification);
+    onWillUnmount(() => {
+        busService.removeEventListener("notification", onNotification);
+    });
+}
+
+export class CrmActivityDashboardDeltaListController extends ListController {
+    setup() {
+        super.setup();
+        useDashboardDeltas(this.model);
+    }
+}
+
+export class CrmActivityDashboardDeltaKanbanController extends KanbanController {
+    setup() {
+        super.setup();
+        useDashboardDeltas(this.model);
+    }
+}
+
+registry.category("views").add("crm_activity_dashboard_list", {
+    ...listView,
+    Controller: CrmActivityDashboardDeltaListController,
+});
+
+registry.category("views").add("crm_activity_dashboard_kanban", {
+    ...kanbanView,
+    Controller: CrmActivityDashboardDeltaKanbanController,
+});
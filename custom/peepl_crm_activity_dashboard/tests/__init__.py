@@ -0,0 +1 @@
+from . import test_crm_activity_kpi
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from odoo import SUPERUSER_ID, api
+from odoo.sql_db import db_connect
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestCrmActivityKpi(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user_id = cls.env.ref('base.user_admin').id
+
+    def _new_env(self):
+        """Environment on a connection of its own, i.e. a real concurrent transaction,
+        rolled back and closed at the end of the test unless committed"""
+        cr = db_connect(self.env.cr.dbname).cursor()
+        self.addCleanup(cr.close)
+        return api.Environment(cr, SUPERUSER_ID, {})
+
+    def _today_total(self, env):
+        env.cr.execute(
+            "SELECT COALESCE(SUM(today_count), 0) FROM crm_activity_kpi WHERE user_id = %s AND team_id IS NULL",
+            (self.user_id,))
+        return env.cr.fetchone()[0]
+
+    def _rebuild_committed(self):
+        env = self._new_env()
+        env['crm.activity.kpi']._rebuild_counters()
+        env.cr.commit()
+
+    def _start_concurrent_test(self):
+        """Commit fresh counters, and rebuild them again once the test is over
+        so that the differences inserted by the test do not stay committed"""
+        self._rebuild_committed()
+        self.addCleanup(self._rebuild_committed)
+        env = self._new_env()
+        return self._today_total(env)
+
+    def test_concurrent_changes(self):
+        """Two transactions changing the counters of the same user both commit"""
+        total = self._start_concurrent_test()
+        env1, env2 = self._new_env(), self._new_env()
+        # Both snapshots are taken before either transaction commits
+        self.assertEqual(self._today_total(env1), total)
+        self.assertEqual(self._today_total(env2), total)
+        env1['crm.activity.kpi']._apply_row_changes({}, {-1: (self.user_id, False, 'today')})
+        env2['crm.activity.kpi']._apply_row_changes({}, {-2: (self.user_id, False, 'today')})
+        env1.cr.commit()
+        env2.cr.commit()
+        self.assertEqual(self._today_total(self._new_env()), total + 2)
+
+    def test_rebuild_during_change(self):
+        """A rebuild committed while a transaction is open keeps its differences"""
+        self._start_concurrent_test()
+        env1, env2 = self._new_env(), self._new_env()
+        env1['crm.activity.kpi']._apply_row_changes({}, {-1: (self.user_id, False, 'today')})
+        env2['crm.activity.kpi']._rebuild_counters()
+        env2.cr.commit()
+        env1.cr.commit()
+        env = self._new_env()
+        env.cr.execute(
+            "SELECT COUNT(*) FROM crm_activity_dashboard WHERE user_id = %s AND team_id IS NULL AND state = 'today'",
+            (self.user_id,))
+        self.assertEqual(self._today_total(env), env.cr.fetchone()[0] + 1)
+
+    def test_rolled_back_savepoint(self):
+        """Changes undone by a savepoint rollback are not counted"""
+        kpi = self.env['crm.activity.kpi']
+        kpi._rebuild_counters()
+        total = self._today_total(self.env)
+        try:
+            with self.env.cr.savepoint():
+                kpi._apply_row_changes({}, {-1: (self.user_id, False, 'today')})
+                raise ValueError('undo the change')
+        except ValueError:
+            pass
+        self.assertEqual(self._today_total(self.env), total)
+        kpi._apply_row_changes({}, {-1: (self.user_id, False, 'today')})
+        self.assertEqual(self._today_total(self.env), total + 1)
@@ -33,6 +33,7 @@ Key Features:
         'views/mail_message_views.xml', 
         'views/res_partner.xml',
         'data/server_actions.xml',
+        'data/ir_cron.xml',
     ],
     
     'demo': [],
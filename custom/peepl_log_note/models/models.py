@@ -1,38 +1,86 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import threading
+from collections import Counter
 from odoo import models, fields, api, _
+from odoo.tools import split_every
+from odoo.tools.sql import column_exists, create_column
 
 _logger = logging.getLogger(__name__)
 
+# Partners updated per transaction by the bulk recompute
+LOG_NOTE_RECOMPUTE_CHUNK_SIZE = 5000
+
 
 class ResPartner(models.Model):
     _inherit = 'res.partner'
 
     log_note_count = fields.Integer(
         string='Log Notes Count',
-        compute='_compute_log_note_count',
-        store=False
+        readonly=True,
+        copy=False,
+        default=0,
+        help='Number of mail.message logs on this partner (all types), '
+             'kept up to date by the mail.message create/write/unlink hooks'
     )
 
-    @api.depends('message_ids', 'message_ids.message_type', 'message_ids.model', 'message_ids.res_id', 'message_ids.subtype_id')
+    def _auto_init(self):
+        """Create and fill the stored counter with one grouped count on install,
+        instead of letting the ORM compute it partner by partner"""
+        if not column_exists(self.env.cr, 'res_partner', 'log_note_count'):
+            create_column(self.env.cr, 'res_partner', 'log_note_count', 'int4')
+            self.env.cr.execute("""
+                UPDATE res_partner p
+                SET log_note_count = m.count
+                FROM (
+                    SELECT res_id, COUNT(*) AS count
+                    FROM mail_message
+                    WHERE model = 'res.partner'
+                    GROUP BY res_id
+                ) m
+                WHERE p.id = m.res_id
+            """)
+        return super()._auto_init()
+
     def _compute_log_note_count(self):
-        """Compute the number of all mail.message logs for this partner (all types)"""
-        for partner in self:
-            count = self.env['mail.message'].search_count([
-                ('model', '=', 'res.partner'),
-                ('res_id', '=', partner.id),
-            ])
-            _logger.debug(f"Partner {partner.name} (ID: {partner.id}): {count} log notes found (all types)")
-            partner.log_note_count = count
+        """Reset the stored count of all mail.message logs (all types) with one grouped count"""
+        if not self:
+            return
+        self.env['mail.message'].flush_model(['model', 'res_id'])
+        self.env.cr.execute("""
+            SELECT res_id, COUNT(*)
+            FROM mail_message
+            WHERE model = 'res.partner' AND res_id IN %s
+            GROUP BY res_id
+        """, (tuple(self.ids),))
+        counts = dict(self.env.cr.fetchall())
+        self.env.cr.execute("""
+            UPDATE res_partner p
+            SET log_note_count = COALESCE(c.count, 0)
+            FROM (SELECT unnest(%s) AS id, unnest(%s) AS count) c
+            WHERE p.id = c.id
+        """, (self.ids, [counts.get(partner_id, 0) for partner_id in self.ids]))
+        self.invalidate_recordset(['log_note_count'])
+
+    @api.model
+    def _apply_log_note_count_delta(self, deltas):
+        """Add ``deltas`` ({partner_id: +/-count}) to the stored log note counts"""
+        deltas = {partner_id: delta for partner_id, delta in deltas.items() if partner_id and delta}
+        if not deltas:
+            return
+        self.env.cr.execute("""
+            UPDATE res_partner p
+            SET log_note_count = COALESCE(p.log_note_count, 0) + d.delta
+            FROM (SELECT unnest(%s) AS id, unnest(%s) AS delta) d
+            WHERE p.id = d.id
+        """, (list(deltas), list(deltas.values())))
+        self.browse(deltas).invalidate_recordset(['log_note_count'])
 
     def action_open_log_note_dashboard(self):
         """Open the log note dashboard for this partner"""
         self.ensure_one()
         
-        # Force recompute before opening to ensure fresh count
-        self._compute_log_note_count()
-        
         # Include all mail.message logs (all types)
         domain = [
             ('model', '=', 'res.partner'),
@@ -59,17 +107,47 @@ class ResPartner(models.Model):
         }
 
     @api.model
-    def recompute_all_log_note_counts(self):
-        """Recompute log note counts for all partners - can be called manually"""
-        partners = self.with_context(active_test=False).search([])
-        partners._compute_log_note_count()
-        _logger.info(f"Manually recomputed log note counts for {len(partners)} partners")
+    def recompute_all_log_note_counts(self, chunk_size=LOG_NOTE_RECOMPUTE_CHUNK_SIZE, auto_commit=False):
+        """Recompute log note counts for all partners - can be called manually or by cron.
+
+        Partners are processed in chunks of ``chunk_size``; each chunk counts its
+        messages at UPDATE time and only writes rows whose stored value differs.
+        With ``auto_commit`` (cron only) every chunk is committed so no long
+        transaction is held open.
+        """
+        auto_commit = auto_commit and not getattr(threading.current_thread(), 'testing', False)
+        self.env['mail.message'].flush_model(['model', 'res_id'])
+        self.env.cr.execute("SELECT id FROM res_partner ORDER BY id")
+        partner_ids = [row[0] for row in self.env.cr.fetchall()]
+
+        updated = 0
+        for done, chunk_ids in enumerate(split_every(chunk_size, partner_ids, list), start=1):
+            self.env.cr.execute("""
+                UPDATE res_partner p
+                SET log_note_count = c.count
+                FROM (
+                    SELECT chunk.id, COUNT(m.id) AS count
+                    FROM unnest(%s) AS chunk(id)
+                    LEFT JOIN mail_message m ON m.model = 'res.partner' AND m.res_id = chunk.id
+                    GROUP BY chunk.id
+                ) c
+                WHERE p.id = c.id AND p.log_note_count IS DISTINCT FROM c.count
+            """, (chunk_ids,))
+            updated += self.env.cr.rowcount
+            if auto_commit:
+                self.env.cr.commit()
+            _logger.info(
+                f"Recomputing log note counts: {min(done * chunk_size, len(partner_ids))}/{len(partner_ids)} partners, "
+                f"{updated} updated")
+        self.invalidate_model(['log_note_count'])
+
+        _logger.info(f"Manually recomputed log note counts for {len(partner_ids)} partners ({updated} updated)")
         return {
             'type': 'ir.actions.client',
             'tag': 'display_notification',
             'params': {
                 'title': _('Success'),
-                'message': _('Log note counts updated for %d partners') % len(partners),
+                'message': _('Log note counts updated for %d partners') % updated,
                 'type': 'success'
             }
         }
@@ -92,63 +170,64 @@ class ResPartner(models.Model):
 class MailMessage(models.Model):
     _inherit = 'mail.message'
 
+    def _get_partner_log_counts(self):
+        """Number of messages in self per partner they are logged on, counted in SQL"""
+        if not self.ids:
+            return Counter()
+        self.flush_model(['model', 'res_id'])
+        self.env.cr.execute("""
+            SELECT res_id, COUNT(*)
+            FROM mail_message
+            WHERE id IN %s AND model = 'res.partner'
+            GROUP BY res_id
+        """, (tuple(self.ids),))
+        return Counter(dict(self.env.cr.fetchall()))
+
     @api.model_create_multi
     def create(self, vals_list):
-        """Override create to trigger partner log note count recomputation"""
+        """Override create to increment partner log note counts"""
         messages = super(MailMessage, self).create(vals_list)
         
-        # Collect partners that need count updates
-        partners_to_update = set()
-        for message in messages:
-            if message.model == 'res.partner':
-                partners_to_update.add(message.res_id)
-                _logger.debug(f"Log created for partner {message.res_id}: {message.subtype_id.name if message.subtype_id else 'No subtype'}, type: {message.message_type}")
-        
-        # Trigger recomputation for affected partners
-        if partners_to_update:
-            partners = self.env['res.partner'].browse(list(partners_to_update))
-            partners._compute_log_note_count()
-            _logger.info(f"Recomputed log note counts for {len(partners)} partners after message creation")
+        # Only messages created on partners matter, decided from the values
+        default_model = self.env.context.get('default_model')
+        partner_messages = self.browse([
+            message_id for message_id, vals in zip(messages.ids, vals_list)
+            if vals.get('model', default_model) == 'res.partner'
+        ])
+        if partner_messages:
+            partner_counts = partner_messages._get_partner_log_counts()
+            self.env['res.partner']._apply_log_note_count_delta(partner_counts)
+            _logger.debug(f"Log notes created for partners {dict(partner_counts)}")
         
         return messages
 
     def unlink(self):
-        """Override unlink to trigger partner log note count recomputation"""
-        # Store partner info before deletion
-        partners_to_update = set()
-        for message in self:
-            if message.model == 'res.partner':
-                partners_to_update.add(message.res_id)
+        """Override unlink to decrement partner log note counts"""
+        # Store partner counts before deletion
+        partner_counts = self._get_partner_log_counts()
         
         result = super(MailMessage, self).unlink()
         
-        # Update partner counts after deletion
-        if partners_to_update:
-            partners = self.env['res.partner'].browse(list(partners_to_update))
-            partners.exists()._compute_log_note_count()
+        if partner_counts:
+            self.env['res.partner']._apply_log_note_count_delta(
+                {partner_id: -count for partner_id, count in partner_counts.items()})
         
         return result
 
     def write(self, vals):
-        """Override write to handle message_type changes"""
-        # Store partners that might be affected before the update
-        partners_before = set()
-        for message in self:
-            if message.model == 'res.partner':
-                partners_before.add(message.res_id)
+        """Override write to move log note counts when messages change document"""
+        # Only a change of document can affect the counts
+        if 'model' not in vals and 'res_id' not in vals:
+            return super(MailMessage, self).write(vals)
+        
+        # Store partner counts before the update
+        partner_counts = self._get_partner_log_counts()
         
         result = super(MailMessage, self).write(vals)
         
-        # If message_type or model changed, recompute affected partners
-        if 'message_type' in vals or 'model' in vals or 'res_id' in vals:
-            partners_after = set()
-            for message in self:
-                if message.model == 'res.partner':
-                    partners_after.add(message.res_id)
-            
-            all_affected_partners = partners_before | partners_after
-            if all_affected_partners:
-                partners = self.env['res.partner'].browse(list(all_affected_partners))
-                partners.exists()._compute_log_note_count()
+        if partner_counts or vals.get('model') == 'res.partner':
+            partner_counts.subtract(self._get_partner_log_counts())
+            self.env['res.partner']._apply_log_note_count_delta(
+                {partner_id: -count for partner_id, count in partner_counts.items()})
         
-        return result
\ No newline at end of file
+        return result
@@ -17,7 +17,7 @@
     # Check https://github.com/odoo/odoo/blob/16.0/odoo/addons/base/data/ir_module_category_data.xml
     # for the full list
     'category': 'Uncategorized',
-    'version': '0.1',
+    'version': '0.2',
 
     # any module necessary for this one to work correctly
     'depends': ['base', 'crm', 'base_import', 'sale'],
@@ -29,6 +29,7 @@
         'views/participant.xml',
         'views/crm.xml',
         'views/sale.xml',
+        'views/participant_import_wizard.xml',
     ],
     # only loaded in demonstration mode
     'demo': [
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Archive the participants whose name (case-insensitive) is already used on
+    the same lead or sale order, so that the unique indexes created by
+    ``participant.init()`` can be built. The oldest participant is kept active."""
+    for column in ('lead_id', 'sale_order_id'):
+        cr.execute(f"""
+            UPDATE participant p
+            SET active = FALSE
+            FROM (
+                SELECT id, MIN(id) OVER (PARTITION BY {column}, lower(first_name), lower(last_name)) AS kept_id
+                FROM participant
+                WHERE {column} IS NOT NULL AND active
+            ) duplicate
+            WHERE p.id = duplicate.id AND duplicate.id != duplicate.kept_id
+            RETURNING p.id, p.{column}, p.first_name, p.last_name, duplicate.kept_id
+        """)
+        for participant_id, target_id, first_name, last_name, kept_id in cr.fetchall():
+            _logger.warning(
+                f"Archived participant {participant_id} \"{first_name} {last_name}\" ({column} {target_id}), "
+                f"duplicate of participant {kept_id}")
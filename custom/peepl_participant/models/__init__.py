@@ -3,3 +3,4 @@
 from . import crm
 from . import participant
 from . import sale_order
+from . import participant_import_wizard
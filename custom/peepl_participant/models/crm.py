@@ -43,6 +43,18 @@ class CrmLead(models.Model):
         for record in self:
             record.participant_count = len(record.participant_ids)
     
+    def action_import_participants(self):
+        """Open the wizard importing participants from a CSV/XLSX file"""
+        self.ensure_one()
+        return {
+            'name': _('Import Participants'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'participant.import.wizard',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {'default_lead_id': self.id},
+        }
+
     def action_view_participants(self):
         self.ensure_one()
         return {
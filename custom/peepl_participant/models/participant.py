@@ -3,7 +3,9 @@
 
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
+from odoo.tools.sql import index_exists
 import logging
+import psycopg2
 
 _logger = logging.getLogger(__name__)
 
@@ -46,38 +48,142 @@ class Participant(models.Model):
     sequence = fields.Integer(string='Sequence', default=10)
     notes = fields.Text(string='Notes')
 
-    @api.constrains('first_name', 'last_name', 'lead_id', 'sale_order_id')
-    def _check_unique_participant_per_lead(self):
-        """Ensure participant names are unique within the same lead or sale order"""
-        for record in self:
-            if record.lead_id:
-                existing = self.search([
-                    ('first_name', '=', record.first_name),
-                    ('last_name', '=', record.last_name),
-                    ('lead_id', '=', record.lead_id.id),
-                    ('id', '!=', record.id)
-                ])
-                if existing:
-                    raise UserError(_('Participant "%s %s" already exists for this lead/opportunity.') % (record.first_name, record.last_name))
-            
-            if record.sale_order_id:
-                existing = self.search([
-                    ('first_name', '=', record.first_name),
-                    ('last_name', '=', record.last_name),
-                    ('sale_order_id', '=', record.sale_order_id.id),
-                    ('id', '!=', record.id)
-                ])
-                if existing:
-                    raise UserError(_('Participant "%s %s" already exists for this sale order.') % (record.first_name, record.last_name))
+    def init(self):
+        """Participant names are unique (case-insensitive) per lead and per sale order,
+        enforced by partial unique indexes so that concurrent imports cannot race.
+
+        Existing duplicates are archived by the 0.2 migration; the update is stopped
+        if some remain, rather than continuing without the indexes.
+        """
+        for index_name, column in (
+            ('participant_lead_name_uniq', 'lead_id'),
+            ('participant_sale_order_name_uniq', 'sale_order_id'),
+        ):
+            if index_exists(self.env.cr, index_name):
+                continue
+            self.env.cr.execute(f"""
+                SELECT {column}, MIN(first_name), MIN(last_name), COUNT(*)
+                FROM participant
+                WHERE {column} IS NOT NULL AND active
+                GROUP BY {column}, lower(first_name), lower(last_name)
+                HAVING COUNT(*) > 1
+                ORDER BY {column}
+                LIMIT 20
+            """)
+            duplicates = self.env.cr.fetchall()
+            if duplicates:
+                raise UserError(_(
+                    'Unable to create the unique index %s, archive or rename these duplicate participants first:\n%s'
+                ) % (index_name, '\n'.join(
+                    f'{column} {target_id}: "{first_name} {last_name}" ({count} participants)'
+                    for target_id, first_name, last_name, count in duplicates
+                )))
+            self.env.cr.execute(f"""
+                CREATE UNIQUE INDEX {index_name}
+                ON participant ({column}, lower(first_name), lower(last_name))
+                WHERE {column} IS NOT NULL AND active
+            """)
+
+    def _check_duplicate_participants(self, candidates):
+        """Ensure participant names are unique within the same lead or sale order.
+
+        ``candidates`` are the values the participants will have once saved, as dicts
+        with ``first_name``, ``last_name``, ``lead_id`` and ``sale_order_id``. The
+        duplicates within the batch and against the database (one query) are all
+        reported together, before the unique indexes would reject the statement.
+        The records of ``self`` are the ones being updated, they are not compared
+        with their own stored values.
+        """
+        candidates = [c for c in candidates if c['first_name'] and c['last_name']
+                      and (c['lead_id'] or c['sale_order_id'])]
+        if not candidates:
+            return
+        messages = {
+            'lead_id': _('Participant "%s %s" already exists for this lead/opportunity.'),
+            'sale_order_id': _('Participant "%s %s" already exists for this sale order.'),
+        }
+        errors = []
+        seen = set()
+        for candidate in candidates:
+            for column in ('lead_id', 'sale_order_id'):
+                if not candidate[column]:
+                    continue
+                key = (column, candidate[column], candidate['first_name'].lower(), candidate['last_name'].lower())
+                if key in seen:
+                    errors.append(messages[column] % (candidate['first_name'], candidate['last_name']))
+                seen.add(key)
+
+        self.flush_model(['first_name', 'last_name', 'lead_id', 'sale_order_id', 'active'])
+        self.env.cr.execute("""
+            SELECT DISTINCT c.first_name, c.last_name,
+                   p.lead_id = c.lead_id AS same_lead,
+                   p.sale_order_id = c.sale_order_id AS same_order
+            FROM unnest(%s::int[], %s::int[], %s::varchar[], %s::varchar[])
+                 AS c(lead_id, sale_order_id, first_name, last_name)
+            JOIN participant p
+              ON (p.lead_id = c.lead_id OR p.sale_order_id = c.sale_order_id)
+             AND lower(p.first_name) = lower(c.first_name)
+             AND lower(p.last_name) = lower(c.last_name)
+             AND p.active
+            WHERE p.id != ALL(%s::int[])
+        """, (
+            [c['lead_id'] or None for c in candidates],
+            [c['sale_order_id'] or None for c in candidates],
+            [c['first_name'] for c in candidates],
+            [c['last_name'] for c in candidates],
+            self.ids,
+        ))
+        for first_name, last_name, same_lead, same_order in self.env.cr.fetchall():
+            if same_lead:
+                errors.append(messages['lead_id'] % (first_name, last_name))
+            if same_order:
+                errors.append(messages['sale_order_id'] % (first_name, last_name))
+        if errors:
+            raise UserError('\n'.join(dict.fromkeys(errors)))
+
+    def _raise_unique_violation(self):
+        """Report a participant rejected by the unique indexes (concurrent creation)"""
+        raise UserError(_('A participant with the same first and last name already exists '
+                          'for this lead/opportunity or sale order.'))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Reject duplicate participant names before inserting them"""
+        self._check_duplicate_participants([{
+            'first_name': vals.get('first_name'),
+            'last_name': vals.get('last_name'),
+            'lead_id': vals['lead_id'] if 'lead_id' in vals else self.env.context.get('default_lead_id'),
+            'sale_order_id': (vals['sale_order_id'] if 'sale_order_id' in vals
+                              else self.env.context.get('default_sale_order_id')),
+        } for vals in vals_list if vals.get('active', True)])
+        try:
+            with self.env.cr.savepoint():
+                return super().create(vals_list)
+        except psycopg2.errors.UniqueViolation:
+            self._raise_unique_violation()
 
     def write(self, vals):
-        """Auto-set completion date when state changes to confirmed"""
+        """Reject duplicate participant names, and auto-set completion date when
+        state changes to confirmed"""
         if 'state' in vals:
             if vals['state'] == 'confirmed':
                 vals['completion_date'] = fields.Datetime.now()
             else:
                 vals['completion_date'] = False
-        return super().write(vals)
+        name_fields = {'first_name', 'last_name', 'lead_id', 'sale_order_id', 'active'}
+        if not name_fields.intersection(vals):
+            return super().write(vals)
+        self._check_duplicate_participants([{
+            'first_name': vals.get('first_name', record.first_name),
+            'last_name': vals.get('last_name', record.last_name),
+            'lead_id': vals.get('lead_id', record.lead_id.id),
+            'sale_order_id': vals.get('sale_order_id', record.sale_order_id.id),
+        } for record in self if vals.get('active', record.active)])
+        try:
+            with self.env.cr.savepoint():
+                return super().write(vals)
+        except psycopg2.errors.UniqueViolation:
+            self._raise_unique_violation()
 
     def action_set_not_confirmed(self):
         """Set state to not yet confirmed"""
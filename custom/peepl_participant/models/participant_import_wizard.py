@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import csv
+import io
+import logging
+
+from odoo import fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import email_normalize, split_every
+
+try:
+    from openpyxl import load_workbook
+except ImportError:
+    load_workbook = None
+
+_logger = logging.getLogger(__name__)
+
+# Participants created per create() call (and per savepoint) by the import
+PARTICIPANT_IMPORT_BATCH_SIZE = 500
+
+# Accepted column headers (normalized) -> participant field
+PARTICIPANT_IMPORT_COLUMNS = {
+    'first_name': 'first_name',
+    'firstname': 'first_name',
+    'last_name': 'last_name',
+    'lastname': 'last_name',
+    'surname': 'last_name',
+    'gender': 'gender',
+    'email': 'email_address',
+    'email_address': 'email_address',
+    'mobile': 'mobile_phone',
+    'mobile_phone': 'mobile_phone',
+    'phone': 'mobile_phone',
+    'job_title': 'job_title_requiring_assessment',
+    'job_title_requiring_assessment': 'job_title_requiring_assessment',
+    'position_level': 'position_level',
+    'notes': 'notes',
+}
+
+
+class ParticipantImportWizard(models.TransientModel):
+    _name = 'participant.import.wizard'
+    _description = 'Import Participants'
+
+    lead_id = fields.Many2one('crm.lead', string='Lead/Opportunity', readonly=True)
+    sale_order_id = fields.Many2one('sale.order', string='Sale Order', readonly=True)
+    file = fields.Binary(string='File', attachment=False,
+                         help='CSV or XLSX file with one participant per row and a header row '
+                              '(First Name, Last Name, Gender, Email, Mobile Phone, Job Title, Position Level, Notes)')
+    filename = fields.Char(string='Filename')
+    state = fields.Selection([('upload', 'Upload'), ('done', 'Done')], default='upload')
+    imported_count = fields.Integer(string='Imported Participants', readonly=True)
+    error_count = fields.Integer(string='Rejected Rows', readonly=True)
+    error_log = fields.Text(string='Errors', readonly=True)
+
+    def _get_target_field(self):
+        """Participant field linking the imported rows to the lead or the sale order"""
+        self.ensure_one()
+        if self.sale_order_id:
+            return 'sale_order_id', self.sale_order_id.id
+        if self.lead_id:
+            return 'lead_id', self.lead_id.id
+        raise UserError(_('Participants can only be imported on a lead or a sale order.'))
+
+    def _iter_file_rows(self):
+        """Yield the rows of the uploaded file as lists of strings, header included"""
+        self.ensure_one()
+        content = base64.b64decode(self.file)
+        if (self.filename or '').lower().endswith('.xlsx'):
+            if load_workbook is None:
+                raise UserError(_('The openpyxl library is required to import XLSX files.'))
+            workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+            try:
+                for row in workbook.active.iter_rows(values_only=True):
+                    yield ['' if value is None else str(value).strip() for value in row]
+            finally:
+                workbook.close()
+        else:
+            text = io.TextIOWrapper(io.BytesIO(content), encoding='utf-8-sig', errors='replace')
+            for row in csv.reader(text):
+                yield [value.strip() for value in row]
+
+    def _read_rows(self):
+        """Map the file columns to participant fields.
+
+        The header is checked right away; returns a generator of
+        ``(row_number, vals)`` for the non-empty rows, read lazily from the file.
+        """
+        rows = self._iter_file_rows()
+        header = next(rows, None)
+        if not header:
+            raise UserError(_('The file is empty.'))
+        columns = [PARTICIPANT_IMPORT_COLUMNS.get(name.lower().replace(' ', '_')) for name in header]
+        if 'first_name' not in columns or 'last_name' not in columns:
+            raise UserError(_('The file must have "First Name" and "Last Name" columns.'))
+        return (
+            (row_number, vals)
+            for row_number, vals in (
+                (row_number, {field: value for field, value in zip(columns, row) if field and value})
+                for row_number, row in enumerate(rows, start=2)
+            )
+            if vals
+        )
+
+    def _get_existing_names(self):
+        """Lowercased (first name, last name) of the target's participants, mapped to
+        None; rows of the file are added with their row number while validating"""
+        target_field, target_id = self._get_target_field()
+        existing = self.env['participant'].search_read([(target_field, '=', target_id)], ['first_name', 'last_name'])
+        return {((p['first_name'] or '').lower(), (p['last_name'] or '').lower()): None for p in existing}
+
+    def _validate_rows(self, rows, seen):
+        """Validate a batch of rows in a few passes.
+
+        ``seen`` holds the names already used (see ``_get_existing_names``) and is
+        updated with the valid rows of the batch, so duplicates are detected across
+        batches. Returns the valid ``[(row_number, vals)]`` and ``{row_number: [errors]}``.
+        """
+        genders = dict(self.env['participant']._fields['gender'].selection)
+        gender_keys = {label.lower(): key for key, label in genders.items()}
+        gender_keys.update({key: key for key in genders})
+        errors = {}
+
+        # Required names, emails and genders
+        for row_number, vals in rows:
+            row_errors = []
+            if not vals.get('first_name') or not vals.get('last_name'):
+                row_errors.append(_('First name and last name are required'))
+            if vals.get('email_address'):
+                email = email_normalize(vals['email_address'])
+                if email:
+                    vals['email_address'] = email
+                else:
+                    row_errors.append(_('Invalid email "%s"') % vals['email_address'])
+            if vals.get('gender'):
+                gender = gender_keys.get(vals['gender'].lower())
+                if gender:
+                    vals['gender'] = gender
+                else:
+                    row_errors.append(_('Unknown gender "%s"') % vals['gender'])
+            if row_errors:
+                errors[row_number] = row_errors
+
+        # Duplicate names, within the file and with the existing participants
+        for row_number, vals in rows:
+            if row_number in errors:
+                continue
+            key = (vals['first_name'].lower(), vals['last_name'].lower())
+            if key in seen:
+                if seen[key]:
+                    errors[row_number] = [_('Duplicate of row %d') % seen[key]]
+                else:
+                    errors[row_number] = [_('Participant "%s %s" already exists') % (vals['first_name'], vals['last_name'])]
+            else:
+                seen[key] = row_number
+
+        valid_rows = [(row_number, vals) for row_number, vals in rows if row_number not in errors]
+        return valid_rows, errors
+
+    def _create_participants(self, valid_rows, errors):
+        """Create a batch of participants, a failing batch is retried row by row
+        so that only the faulty rows are rejected"""
+        target_field, target_id = self._get_target_field()
+        Participant = self.env['participant'].with_context(tracking_disable=True)
+        self.env.cr.execute(f"SELECT COALESCE(MAX(sequence), 0) FROM participant WHERE {target_field} = %s", (target_id,))
+        sequence = self.env.cr.fetchone()[0]
+        for row_number, vals in valid_rows:
+            sequence += 10
+            vals.update({target_field: target_id, 'sequence': sequence})
+
+        try:
+            with self.env.cr.savepoint():
+                Participant.create([vals for row_number, vals in valid_rows])
+            return len(valid_rows)
+        except Exception as e:
+            _logger.info(f"Participant import batch failed, retrying row by row: {e}")
+        created = 0
+        for row_number, vals in valid_rows:
+            try:
+                with self.env.cr.savepoint():
+                    Participant.create(vals)
+                created += 1
+            except Exception as row_error:
+                errors[row_number] = [str(row_error)]
+        return created
+
+    def action_import(self):
+        """Import the participants of the file and show the result"""
+        self.ensure_one()
+        if not self.file:
+            raise UserError(_('Please select a file to import.'))
+        rows = self._read_rows()
+        seen = self._get_existing_names()
+        created = 0
+        errors = {}
+        # Rows are read, validated and created one batch at a time
+        for batch in split_every(PARTICIPANT_IMPORT_BATCH_SIZE, rows, list):
+            valid_rows, batch_errors = self._validate_rows(batch, seen)
+            errors.update(batch_errors)
+            if valid_rows:
+                created += self._create_participants(valid_rows, errors)
+        _logger.info(f"Imported {created} participants from {self.filename}, {len(errors)} rows rejected")
+
+        self.write({
+            'state': 'done',
+            'file': False,
+            'imported_count': created,
+            'error_count': len(errors),
+            'error_log': '\n'.join(
+                _('Row %d: %s') % (row_number, ', '.join(row_errors))
+                for row_number, row_errors in sorted(errors.items())
+            ),
+        })
+        return {
+            'name': _('Import Participants'),
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from odoo import api, fields, models, _
+from odoo import api, fields, models, _, Command
 from odoo.exceptions import UserError
+from odoo.tools import float_compare
 
 
 class AccountMove(models.Model):
@@ -183,32 +184,8 @@ class AccountMove(models.Model):
                 # Create proper lines after creation
                 move._sync_invoice_lines_with_sale_order()
             elif move.source_sale_order_id.is_down_payment:
-                # Use Odoo's standard down payment wizard logic
-                wizard_vals = {
-                    'sale_order_ids': [(6, 0, [move.source_sale_order_id.id])],
-                    'advance_payment_method': 'percentage',
-                    'amount': move.source_sale_order_id.down_payment_percentage,
-                }
-                wizard = self.env['sale.advance.payment.inv'].create(wizard_vals)
-                # This will create the invoice and link it to the SO; we want to copy the lines to this move
-                # Find the invoice just created (should be the latest for this SO)
-                created_invoices = wizard._create_invoices(move.source_sale_order_id)
-                if created_invoices:
-                    # Copy lines from the generated invoice to this move
-                    move.invoice_line_ids = [(5, 0, 0)]  # Clear any lines
-                    for line in created_invoices[0].invoice_line_ids:
-                        move.invoice_line_ids = [(0, 0, {
-                            'name': line.name,
-                            'quantity': line.quantity,
-                            'price_unit': line.price_unit,
-                            'product_id': line.product_id.id,
-                            'tax_ids': [(6, 0, line.tax_ids.ids)],
-                            'account_id': line.account_id.id,
-                            'analytic_account_id': line.analytic_account_id.id if line.analytic_account_id else False,
-                        })]
-                    # Optionally, delete the generated invoice to avoid duplicates
-                    created_invoices[0].unlink()
-            return move
+                move._set_down_payment_lines()
+        return move
 
     def write(self, vals):
         """Override to handle sale order updates"""
@@ -224,122 +201,163 @@ class AccountMove(models.Model):
                         # Sync lines properly
                         move._sync_invoice_lines_with_sale_order()
                     elif move.source_sale_order_id.is_down_payment and move.state == 'draft':
-                        # Use Odoo's standard down payment wizard logic
-                        wizard_vals = {
-                            'sale_order_ids': [(6, 0, [move.source_sale_order_id.id])],
-                            'advance_payment_method': 'percentage',
-                            'amount': move.source_sale_order_id.down_payment_percentage,
-                        }
-                        wizard = self.env['sale.advance.payment.inv'].create(wizard_vals)
-                        created_invoices = wizard._create_invoices(move.source_sale_order_id)
-                        if created_invoices:
-                            move.invoice_line_ids = [(5, 0, 0)]
-                            for line in created_invoices[0].invoice_line_ids:
-                                move.invoice_line_ids = [(0, 0, {
-                                    'name': line.name,
-                                    'quantity': line.quantity,
-                                    'price_unit': line.price_unit,
-                                    'product_id': line.product_id.id,
-                                    'tax_ids': [(6, 0, line.tax_ids.ids)],
-                                    'account_id': line.account_id.id,
-                                    'analytic_account_id': line.analytic_account_id.id if line.analytic_account_id else False,
-                                })]
-                            created_invoices[0].unlink()
+                        move._set_down_payment_lines()
         return result
 
+    def _set_down_payment_lines(self):
+        """Replace the lines of this invoice with the down payment of the source sale order.
+
+        The down payment sale order lines are prepared like the standard down
+        payment wizard does, but the invoice lines are written on this move in a
+        single assignment instead of creating (and deleting) a separate invoice.
+        """
+        self.ensure_one()
+        order = self.source_sale_order_id
+        wizard = self.env['sale.advance.payment.inv'].with_company(order.company_id).create({
+            'sale_order_ids': [Command.set(order.ids)],
+            'advance_payment_method': 'percentage',
+            'amount': order.down_payment_percentage,
+        })
+
+        # Create deposit product if necessary
+        if not wizard.product_id:
+            wizard.product_id = self.env['product.product'].create(wizard._prepare_down_payment_product_values())
+            self.env['ir.config_parameter'].sudo().set_param('sale.default_deposit_product_id', wizard.product_id.id)
+
+        SaleOrderLine = self.env['sale.order.line'].with_context(sale_no_log_for_new_lines=True)
+        # Create down payment section if necessary
+        if not any(line.display_type and line.is_downpayment for line in order.order_line):
+            SaleOrderLine.create(wizard._prepare_down_payment_section_values(order))
+        down_payment_line = SaleOrderLine.create(wizard._prepare_so_line_values(order))
+
+        self.write({'invoice_line_ids': [
+            Command.clear(),
+            Command.create(down_payment_line._prepare_invoice_line(
+                name=wizard._get_down_payment_description(order),
+                quantity=1.0,
+            )),
+        ]})
+
     def _sync_invoice_lines_with_sale_order(self):
-        """Synchronize invoice lines with sale order lines - our custom logic"""
+        """Synchronize invoice lines with sale order lines - our custom logic.
+
+        Existing lines are matched with the sale order lines through their
+        ``sale_line_ids``: only the changed values are updated, missing lines are
+        added and obsolete ones removed, all in a single write.
+        """
         if not self.source_sale_order_id or self.state != 'draft':
             return
-            
-        # Clear all existing lines
-        self.invoice_line_ids.unlink()
-        
-        # Create new lines based on sale order
+
+        target_vals = self._prepare_sync_invoice_lines_vals()
+        commands = []
+        for invoice_line in self.invoice_line_ids:
+            sale_line = invoice_line.sale_line_ids if len(invoice_line.sale_line_ids) == 1 else None
+            line_vals = target_vals.pop(sale_line, None)
+            if line_vals is None:
+                # Not (or no longer) invoiceable, or already matched by another line
+                commands.append(Command.delete(invoice_line.id))
+                continue
+            changed_vals = invoice_line._get_sync_changed_values(line_vals)
+            if changed_vals:
+                commands.append(Command.update(invoice_line.id, changed_vals))
+        commands += [Command.create(line_vals) for line_vals in target_vals.values()]
+
+        if commands:
+            self.write({'invoice_line_ids': commands})
+
+    def _prepare_sync_invoice_lines_vals(self):
+        """Values of the invoice lines expected for the source sale order.
+
+        Returns ``{sale_line: vals}`` for the lines with a quantity to invoice.
+        """
         sale_order = self.source_sale_order_id
-        lines_data = []
-        
-        if sale_order.is_product_participant:
-            for line in sale_order.order_line:
-                if line.display_type:
-                    continue  # skip section/note lines
-                    
-                # Calculate quantity to invoice (incremental - not total delivered)
-                if line.qty_delivered_method == 'participants':
-                    # For participants: delivered - already invoiced
-                    total_delivered = line.completed_participants_count
-                    already_invoiced = self._get_already_invoiced_qty(line)
-                    qty_to_invoice = total_delivered - already_invoiced
-                else:
-                    # For regular delivery: delivered - already invoiced  
-                    total_delivered = line.qty_delivered if line.qty_delivered > 0 else line.product_uom_qty
-                    already_invoiced = self._get_already_invoiced_qty(line)
-                    qty_to_invoice = total_delivered - already_invoiced
-                    
-                if qty_to_invoice <= 0:
-                    continue
-                    
-                # Create line data
-                line_vals = {
-                    'move_id': self.id,
-                    'product_id': line.product_id.id,
-                    'name': line.name,
-                    'quantity': qty_to_invoice,
-                    'product_uom_id': line.product_uom.id,
-                    'price_unit': line.price_unit,
-                    'discount': line.discount,
-                    'tax_ids': [(6, 0, line.tax_id.ids)],
-                    'sequence': line.sequence,
-                    'sale_line_ids': [(6, 0, [line.id])],
-                }
+        target_vals = {}
+        if not sale_order.is_product_participant:
+            # For non-participant orders, no lines are synchronized
+            return target_vals
+
+        order_lines = sale_order.order_line.filtered(lambda l: not l.display_type)  # skip section/note lines
+        already_invoiced_qties = self._get_already_invoiced_qties(order_lines)
+        for line in order_lines:
+            # Calculate quantity to invoice (incremental - not total delivered)
+            already_invoiced = already_invoiced_qties.get(line.id, 0.0)
+            if line.qty_delivered_method == 'participants':
+                # For participants: delivered - already invoiced
+                total_delivered = line.completed_participants_count
+                qty_to_invoice = total_delivered - already_invoiced
+            else:
+                # For regular delivery: delivered - already invoiced  
+                total_delivered = line.qty_delivered if line.qty_delivered > 0 else line.product_uom_qty
+                qty_to_invoice = total_delivered - already_invoiced
                 
-                # Add analytic distribution if present
-                if line.analytic_distribution:
-                    line_vals['analytic_distribution'] = line.analytic_distribution
-                    
-                # Add participant note if using participant delivery method
-                if line.qty_delivered_method == 'participants':
-                    participant_note = _('\nParticipants completed: %d/%d (invoicing: %d)') % (
-                        line.completed_participants_count, 
-                        line.participants_count,
-                        qty_to_invoice
-                    )
-                    line_vals['name'] += participant_note
+            if qty_to_invoice <= 0:
+                continue
                 
-                lines_data.append(line_vals)
+            # Create line data
+            line_vals = {
+                'product_id': line.product_id.id,
+                'name': line.name,
+                'quantity': qty_to_invoice,
+                'product_uom_id': line.product_uom.id,
+                'price_unit': line.price_unit,
+                'discount': line.discount,
+                'tax_ids': [Command.set(line.tax_id.ids)],
+                'sequence': line.sequence,
+                'sale_line_ids': [Command.set([line.id])],
+            }
             
-            # Create all lines at once
-            if lines_data:
-                self.env['account.move.line'].create(lines_data)
-        else:
-            # For non-participant orders, just create standard lines
-            return
+            # Add analytic distribution if present
+            if line.analytic_distribution:
+                line_vals['analytic_distribution'] = line.analytic_distribution
+                
+            # Add participant note if using participant delivery method
+            if line.qty_delivered_method == 'participants':
+                participant_note = _('\nParticipants completed: %d/%d (invoicing: %d)') % (
+                    line.completed_participants_count, 
+                    line.participants_count,
+                    qty_to_invoice
+                )
+                line_vals['name'] += participant_note
+            
+            target_vals[line] = line_vals
+        return target_vals
 
     def _get_already_invoiced_qty(self, sale_line):
         """Calculate how much quantity has already been invoiced for this sale order line"""
-        # Find all confirmed/posted invoices linked to this sale order (excluding current draft)
-        invoiced_lines = self.env['account.move.line'].search([
-            ('sale_line_ids', 'in', sale_line.ids),
-            ('move_id.state', 'in', ['posted']),  # Only confirmed invoices
-            ('move_id.move_type', '=', 'out_invoice'),  # Only customer invoices
-            ('move_id', '!=', self.id),  # Exclude current invoice
-        ])
-        
-        # Sum up quantities already invoiced
-        total_invoiced = sum(invoiced_lines.mapped('quantity'))
-        
-        # Also check draft invoices that are not the current one
-        draft_invoiced_lines = self.env['account.move.line'].search([
-            ('sale_line_ids', 'in', sale_line.ids),
-            ('move_id.state', '=', 'draft'),
-            ('move_id.move_type', '=', 'out_invoice'),
-            ('move_id', '!=', self.id),  # Exclude current invoice
-            ('move_id.source_sale_order_id', '=', self.source_sale_order_id.id),  # Same sale order
-        ])
-        
-        total_invoiced += sum(draft_invoiced_lines.mapped('quantity'))
-        
-        return total_invoiced
+        return self._get_already_invoiced_qties(sale_line).get(sale_line.id, 0.0)
+
+    def _get_already_invoiced_qties(self, sale_lines):
+        """Quantities already invoiced for the given sale order lines, excluding this invoice.
+
+        Posted customer invoices count, as well as the other draft invoices of
+        the same source sale order. All the lines are summed with one grouped
+        query over the sale line/invoice line relation.
+        Returns ``{sale_line_id: quantity}``.
+        """
+        if not sale_lines:
+            return {}
+        self.env['account.move.line'].flush_model(['quantity', 'move_id'])
+        self.env['account.move'].flush_model(['state', 'move_type', 'source_sale_order_id'])
+        self.env['sale.order.line'].flush_model(['invoice_lines'])
+        self.env.cr.execute("""
+            SELECT rel.order_line_id, SUM(aml.quantity)
+            FROM sale_order_line_invoice_rel rel
+            JOIN account_move_line aml ON aml.id = rel.invoice_line_id
+            JOIN account_move am ON am.id = aml.move_id
+            WHERE rel.order_line_id IN %(sale_line_ids)s
+              AND am.move_type = 'out_invoice'
+              AND am.id != %(move_id)s
+              AND (
+                  am.state = 'posted'
+                  OR (am.state = 'draft' AND am.source_sale_order_id = %(sale_order_id)s)
+              )
+            GROUP BY rel.order_line_id
+        """, {
+            'sale_line_ids': tuple(sale_lines.ids),
+            'move_id': self.id or 0,
+            'sale_order_id': self.source_sale_order_id.id or 0,
+        })
+        return dict(self.env.cr.fetchall())
 
 
 class AccountMoveLine(models.Model):
@@ -363,6 +381,38 @@ class AccountMoveLine(models.Model):
             else:
                 line.related_participant_count = 0
 
+    def _get_sync_changed_values(self, line_vals):
+        """Subset of ``line_vals`` (as prepared by the sale order sync) that differs
+        from this invoice line.
+
+        When the product or its unit changes, all the values are returned: the
+        values left out of the write would be recomputed from the new product
+        (list price, taxes, label) instead of keeping those of the sale line.
+        """
+        self.ensure_one()
+        product_changed = self.product_id.id != line_vals.get('product_id', self.product_id.id)
+        uom_changed = self.product_uom_id.id != line_vals.get('product_uom_id', self.product_uom_id.id)
+        if product_changed or uom_changed:
+            return {field_name: value for field_name, value in line_vals.items() if field_name != 'sale_line_ids'}
+        changed_vals = {}
+        for field_name, value in line_vals.items():
+            if field_name == 'sale_line_ids':
+                continue
+            field = self._fields[field_name]
+            if field_name == 'tax_ids':
+                if set(self.tax_ids.ids) != set(value[0][2]):
+                    changed_vals[field_name] = value
+            elif field.type == 'many2one':
+                if self[field_name].id != value:
+                    changed_vals[field_name] = value
+            elif field.type == 'float':
+                digits = field.get_digits(self.env)
+                if float_compare(self[field_name], value, precision_digits=digits[1] if digits else 6):
+                    changed_vals[field_name] = value
+            elif self[field_name] != value:
+                changed_vals[field_name] = value
+        return changed_vals
+
     def action_view_line_participants(self):
         """View participants for this invoice line"""
         self.ensure_one()
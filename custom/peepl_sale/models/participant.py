@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 # Part of Peepl Sale Module - Extends existing participant model
 
+import logging
+
 from odoo import api, fields, models, _
 from odoo.exceptions import ValidationError
 
+_logger = logging.getLogger(__name__)
+
+# Participant names listed in the sale order message of a state change
+STATE_SUMMARY_MAX_NAMES = 20
+
 
 class Participant(models.Model):
     _inherit = 'participant'
@@ -58,6 +65,7 @@ class Participant(models.Model):
 
     @api.depends('sale_line_id', 'sale_line_id.project_id', 'sale_order_id', 'sale_order_id.project_ids')
     def _compute_project_id(self):
+        order_projects = {}
         for participant in self:
             project = False
             
@@ -71,8 +79,11 @@ class Participant(models.Model):
             # Fallback to sale order project
             if not project and participant.sale_order_id:
                 if hasattr(participant.sale_order_id, 'project_ids') and participant.sale_order_id.project_ids:
-                    # Get the most recent project
-                    project = participant.sale_order_id.project_ids.sorted('create_date', reverse=True)[0]
+                    # Get the most recent project, once per order
+                    order = participant.sale_order_id
+                    if order not in order_projects:
+                        order_projects[order] = order._get_participant_fallback_project()
+                    project = order_projects[order]
                 elif hasattr(participant.sale_order_id, 'project_id') and participant.sale_order_id.project_id:
                     project = participant.sale_order_id.project_id
             
@@ -80,12 +91,16 @@ class Participant(models.Model):
 
     @api.depends('sale_line_id', 'sale_line_id.price_unit')
     def _compute_unit_price(self):
+        # Count the participants of all the lines of the batch with one grouped query
+        lines = self.sale_line_id._origin
+        participant_counts = {}
+        if lines:
+            groups = self.read_group([('sale_line_id', 'in', lines.ids)], ['sale_line_id'], ['sale_line_id'])
+            participant_counts = {group['sale_line_id'][0]: group['sale_line_id_count'] for group in groups}
         for participant in self:
             if participant.sale_line_id:
                 # Calculate price per participant
-                total_participants = self.search_count([
-                    ('sale_line_id', '=', participant.sale_line_id.id)
-                ])
+                total_participants = participant_counts.get(participant.sale_line_id._origin.id, 0)
                 if total_participants > 0:
                     participant.unit_price = participant.sale_line_id.price_unit / total_participants
                 else:
@@ -99,19 +114,11 @@ class Participant(models.Model):
         """Allow only state changes if SO is confirmed; block all other edits."""
         allowed_keys = {'state', 'completion_date', 'notes','sale_line_id', 'project_id', 'lead_id', 'sale_order_id'}
         
-        # Store sale lines that will need quantity updates
-        affected_sale_lines = set()
-        
-        for participant in self:
-            if participant.sale_order_id and participant.sale_order_id.state == 'sale':
-                if set(vals.keys()) - allowed_keys:
-                    raise ValidationError(_(
-                        'Cannot modify participant data when the sale order is confirmed.'
-                    ))
-            
-            # Collect sale lines that will be affected by state changes
-            if 'state' in vals and participant.sale_line_id and participant.sale_line_id.qty_delivered_method == 'participants':
-                affected_sale_lines.add(participant.sale_line_id.id)
+        if set(vals.keys()) - allowed_keys:
+            if any(order.state == 'sale' for order in self.sale_order_id):
+                raise ValidationError(_(
+                    'Cannot modify participant data when the sale order is confirmed.'
+                ))
 
         result = super().write(vals)
 
@@ -119,22 +126,42 @@ class Participant(models.Model):
         if 'sale_line_id' in vals:
             self._compute_project_id()
 
-        # Post message on related sale order when state changes
+        # Update delivered quantities and post on related sale orders when state changes
         if 'state' in vals:
-            for participant in self:
-                if participant.sale_order_id:
-                    old_state = self._get_state_display(vals.get('state'))
-                    message = _('Participant %s state changed to %s.') % (participant.full_name, old_state)
-                    if participant.sale_line_id.qty_delivered_method == 'participants':
-                        # If the sale line uses participants delivery method, we need to update qty_delivered
-                        participant.sale_line_id._compute_qty_delivered()
-                        message += _(' Quantity delivered updated.')
-                    # update sale order line qyty_delivered
-                   
-                    participant.sale_order_id.message_post(body=message)
+            self._after_state_transition(vals['state'])
                     
         return result
 
+    def _after_state_transition(self, state):
+        """Recompute qty_delivered once per affected sale line and post one
+        summary message per sale order for the participants in self"""
+        lines = self.sale_line_id.filtered(lambda sol: sol.qty_delivered_method == 'participants')
+        if lines:
+            lines._compute_qty_delivered()
+
+        state_display = self._get_state_display(state)
+        for order in self.sale_order_id:
+            participants = self.filtered(lambda p: p.sale_order_id == order)
+            if len(participants) == 1:
+                message = _('Participant %s state changed to %s.') % (participants.full_name, state_display)
+            else:
+                names = ', '.join(participants[:STATE_SUMMARY_MAX_NAMES].mapped('full_name'))
+                if len(participants) > STATE_SUMMARY_MAX_NAMES:
+                    names += _(' and %d more') % (len(participants) - STATE_SUMMARY_MAX_NAMES)
+                message = _('%d participants state changed to %s: %s.') % (len(participants), state_display, names)
+            if participants.sale_line_id & lines:
+                message += _(' Quantity delivered updated.')
+            order.message_post(body=message)
+
+    def _set_state(self, state):
+        """Move all participants in self to ``state`` with a single write.
+
+        Returns the sale lines whose delivered quantity was recomputed.
+        """
+        if self:
+            self.write({'state': state})
+        return self.sale_line_id.filtered(lambda sol: sol.qty_delivered_method == 'participants')
+
     def unlink(self):
         # Allow deletion only if not linked to confirmed sale order, or if only state is being changed
         allowed_keys = {'state', 'completion_date', 'notes','sale_line_id', 'project_id', 'lead_id', 'sale_order_id'}
@@ -185,60 +212,66 @@ class Participant(models.Model):
     
     def action_set_rescheduled(self):
         """Set participant state to rescheduled, show notification, and refresh view"""
-        for participant in self:
-            participant.state = 'rescheduled'
-            participant.completion_date = False
-            return [
-                {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': _('Rescheduled'),
-                        'message': _('Participant %s has been rescheduled.') % participant.full_name,
-                        'type': 'warning',
-                    }
-                },
-                {'type': 'ir.actions.act_window_close'},
-                {'type': 'ir.actions.client', 'tag': 'reload'},
-            ]
+        self._set_state('rescheduled')
+        if len(self) == 1:
+            message = _('Participant %s has been rescheduled.') % self.full_name
+        else:
+            message = _('%d participants have been rescheduled.') % len(self)
+        return [
+            {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Rescheduled'),
+                    'message': message,
+                    'type': 'warning',
+                }
+            },
+            {'type': 'ir.actions.act_window_close'},
+            {'type': 'ir.actions.client', 'tag': 'reload'},
+        ]
 
     def action_set_cancelled(self):
         """Set participant state to cancelled, show notification, and refresh view"""
-        for participant in self:
-            participant.state = 'cancelled'
-            participant.completion_date = False
-            return [
-                {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': _('Cancelled'),
-                        'message': _('Participant %s has been cancelled.') % participant.full_name,
-                        'type': 'danger',
-                    }
-                },
-                {'type': 'ir.actions.act_window_close'},
-                {'type': 'ir.actions.client', 'tag': 'reload'},
-            ]
+        self._set_state('cancelled')
+        if len(self) == 1:
+            message = _('Participant %s has been cancelled.') % self.full_name
+        else:
+            message = _('%d participants have been cancelled.') % len(self)
+        return [
+            {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Cancelled'),
+                    'message': message,
+                    'type': 'danger',
+                }
+            },
+            {'type': 'ir.actions.act_window_close'},
+            {'type': 'ir.actions.client', 'tag': 'reload'},
+        ]
         
     def action_set_not_yet_confirmed(self):
         """Set participant state to not yet confirmed, show notification, and refresh view"""
-        for participant in self:
-            participant.state = 'not_yet_confirmed'
-            participant.completion_date = False
-            return [
-                {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': _('Not Yet Confirmed'),
-                        'message': _('Participant %s is now marked as not yet confirmed.') % participant.full_name,
-                        'type': 'info',
-                    }
-                },
-                {'type': 'ir.actions.act_window_close'},
-                {'type': 'ir.actions.client', 'tag': 'reload'},
-            ]
+        self._set_state('not_yet_confirmed')
+        if len(self) == 1:
+            message = _('Participant %s is now marked as not yet confirmed.') % self.full_name
+        else:
+            message = _('%d participants are now marked as not yet confirmed.') % len(self)
+        return [
+            {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Not Yet Confirmed'),
+                    'message': message,
+                    'type': 'info',
+                }
+            },
+            {'type': 'ir.actions.act_window_close'},
+            {'type': 'ir.actions.client', 'tag': 'reload'},
+        ]
 
     @api.model
     def _get_fields_to_export(self):
@@ -250,164 +283,38 @@ class Participant(models.Model):
         ]
     
 
-    # If the above methods still don't work, replace with this ultra-robust approach
+    @api.model
+    def _rpc_set_state(self, participant_ids, state):
+        """Set the state of the given participants with one write, the delivered
+        quantities of their sale lines are recomputed once per line"""
+        participants = self.browse(participant_ids).exists()
+        lines = participants._set_state(state)
+        _logger.info(f"Participants set to {state}: {len(participants)} participants, {len(lines)} sale lines updated")
+        return {'success': True, 'count': len(participants), 'affected_lines': len(lines)}
 
     @api.model
     def rpc_set_confirmed(self, participant_ids):
-        """Ultra-robust method to set participants as confirmed with direct qty_delivered update"""
+        """Set participants as confirmed and update qty_delivered of their sale lines"""
         try:
-            participants = self.browse(participant_ids)
-            affected_sale_lines = {}  # Use dict to store line info
-            
-            import logging
-            _logger = logging.getLogger(__name__)
-            _logger.info(f"=== RPC CONFIRMED START: {len(participants)} participants ===")
-            
-            for participant in participants:
-                # Update participant state
-                old_state = participant.state
-                participant.write({
-                    'state': 'confirmed',
-                    'completion_date': fields.Date.today()
-                })
-                _logger.info(f"Updated participant {participant.id} from {old_state} to confirmed")
-                
-                # Collect sale lines that need qty_delivered update
-                if participant.sale_line_id and participant.sale_line_id.qty_delivered_method == 'participants':
-                    line = participant.sale_line_id
-                    if line.id not in affected_sale_lines:
-                        affected_sale_lines[line.id] = line
-            
-            # Update qty_delivered for each affected sale line
-            for line_id, line in affected_sale_lines.items():
-                _logger.info(f"Processing sale line {line_id}")
-                
-                # Get all participants for this line
-                if line.auto_link_participants and not line.related_participants_ids:
-                    line_participants = line.all_order_participants_ids
-                    _logger.info(f"Using all order participants: {len(line_participants)}")
-                else:
-                    line_participants = line.related_participants_ids
-                    _logger.info(f"Using linked participants: {len(line_participants)}")
-                
-                # Count completed participants
-                completed_participants = line_participants.filtered(lambda p: p.state == 'confirmed')
-                completed_count = len(completed_participants)
-                old_qty = line.qty_delivered
-                
-                _logger.info(f"Completed participants: {completed_count}, Old qty_delivered: {old_qty}")
-                
-                # Method 1: Try ORM update first
-                try:
-                    line.invalidate_cache(['qty_delivered'])
-                    line._compute_qty_delivered()
-                    if line.qty_delivered != completed_count:
-                        # Method 2: Direct assignment
-                        line.qty_delivered = completed_count
-                    _logger.info(f"Updated qty_delivered to {line.qty_delivered}")
-                except Exception as orm_error:
-                    _logger.error(f"ORM update failed: {orm_error}")
-                    # Method 3: Direct SQL as last resort
-                    self.env.cr.execute(
-                        "UPDATE sale_order_line SET qty_delivered = %s WHERE id = %s",
-                        (completed_count, line.id)
-                    )
-                    _logger.info(f"Used SQL update to set qty_delivered = {completed_count}")
-            
-            _logger.info(f"=== RPC CONFIRMED END ===")
-            return {'success': True, 'count': len(participants), 'affected_lines': len(affected_sale_lines)}
-            
+            return self._rpc_set_state(participant_ids, 'confirmed')
         except Exception as e:
-            import logging
-            _logger = logging.getLogger(__name__)
             _logger.error(f"Error in rpc_set_confirmed: {e}")
             return {'success': False, 'error': str(e)}
 
-    # Add similar methods for other states...
     @api.model  
     def rpc_set_rescheduled(self, participant_ids):
-        """Ultra-robust method to set participants as rescheduled"""
+        """Set participants as rescheduled"""
         try:
-            participants = self.browse(participant_ids)
-            affected_sale_lines = {}
-            
-            for participant in participants:
-                participant.write({
-                    'state': 'rescheduled',
-                    'completion_date': False
-                })
-                
-                if participant.sale_line_id and participant.sale_line_id.qty_delivered_method == 'participants':
-                    line = participant.sale_line_id
-                    if line.id not in affected_sale_lines:
-                        affected_sale_lines[line.id] = line
-            
-            for line_id, line in affected_sale_lines.items():
-                if line.auto_link_participants and not line.related_participants_ids:
-                    line_participants = line.all_order_participants_ids
-                else:
-                    line_participants = line.related_participants_ids
-                
-                completed_count = len(line_participants.filtered(lambda p: p.state == 'confirmed'))
-                
-                try:
-                    line.invalidate_cache(['qty_delivered'])
-                    line._compute_qty_delivered()
-                    if line.qty_delivered != completed_count:
-                        line.qty_delivered = completed_count
-                except:
-                    self.env.cr.execute(
-                        "UPDATE sale_order_line SET qty_delivered = %s WHERE id = %s",
-                        (completed_count, line.id)
-                    )
-            
-            return {'success': True, 'count': len(participants)}
+            return self._rpc_set_state(participant_ids, 'rescheduled')
         except Exception as e:
-            import logging
-            _logger = logging.getLogger(__name__)
             _logger.error(f"Error in rpc_set_rescheduled: {e}")
             return {'success': False, 'error': str(e)}
     
+    @api.model
     def rpc_set_cancelled(self, participant_ids):
-        """Ultra-robust method to set participants as cancelled"""
+        """Set participants as cancelled"""
         try:
-            participants = self.browse(participant_ids)
-            affected_sale_lines = {}
-            
-            for participant in participants:
-                participant.write({
-                    'state': 'cancelled',
-                    'completion_date': False
-                })
-                
-                if participant.sale_line_id and participant.sale_line_id.qty_delivered_method == 'participants':
-                    line = participant.sale_line_id
-                    if line.id not in affected_sale_lines:
-                        affected_sale_lines[line.id] = line
-            
-            for line_id, line in affected_sale_lines.items():
-                if line.auto_link_participants and not line.related_participants_ids:
-                    line_participants = line.all_order_participants_ids
-                else:
-                    line_participants = line.related_participants_ids
-                
-                completed_count = len(line_participants.filtered(lambda p: p.state == 'confirmed'))
-                
-                try:
-                    line.invalidate_cache(['qty_delivered'])
-                    line._compute_qty_delivered()
-                    if line.qty_delivered != completed_count:
-                        line.qty_delivered = completed_count
-                except:
-                    self.env.cr.execute(
-                        "UPDATE sale_order_line SET qty_delivered = %s WHERE id = %s",
-                        (completed_count, line.id)
-                    )
-            
-            return {'success': True, 'count': len(participants)}
+            return self._rpc_set_state(participant_ids, 'cancelled')
         except Exception as e:
-            import logging
-            _logger = logging.getLogger(__name__)
             _logger.error(f"Error in rpc_set_cancelled: {e}")
             return {'success': False, 'error': str(e)}
-        
\ No newline at end of file
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 # Part of Peepl Sale Module
 
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 
 
@@ -28,13 +30,29 @@ class Project(models.Model):
         compute='_compute_is_participant_based'
     )
 
+    def _get_participant_state_counts(self):
+        """Participants per state of each project with one grouped query.
+
+        Returns ``{project_id: {state: count}}``.
+        """
+        project_ids = self._origin.ids
+        if not project_ids:
+            return {}
+        groups = self.env['participant'].read_group(
+            [('project_id', 'in', project_ids)],
+            ['project_id', 'state'], ['project_id', 'state'], lazy=False)
+        state_counts = defaultdict(lambda: defaultdict(int))
+        for group in groups:
+            state_counts[group['project_id'][0]][group['state']] += group['__count']
+        return state_counts
+
     @api.depends('participant_ids', 'participant_ids.state')
     def _compute_participant_count(self):
+        state_counts = self._get_participant_state_counts()
         for project in self:
-            project.participant_count = len(project.participant_ids)
-            project.completed_participants_count = len(
-                project.participant_ids.filtered(lambda p: p.state == 'confirmed')
-            )
+            counts = state_counts.get(project._origin.id, {})
+            project.participant_count = sum(counts.values())
+            project.completed_participants_count = counts.get('confirmed', 0)
 
     @api.depends('sale_line_id.product_id.service_policy')
     def _compute_is_participant_based(self):
@@ -146,18 +164,20 @@ class Project(models.Model):
         if not self.user_has_groups('project.group_project_user'):
             return {}
         
-        participants = self.participant_ids.sudo()
+        Participant = self.env['participant'].sudo()
+        counts = self.sudo()._get_participant_state_counts().get(self.id, {})
         
         return {
-            'total': len(participants),
-            'completed': len(participants.filtered(lambda p: p.state == 'confirmed')),
-            'pending': len(participants.filtered(lambda p: p.state == 'not_yet_confirmed')),
-            'rescheduled': len(participants.filtered(lambda p: p.state == 'rescheduled')),
-            'cancelled': len(participants.filtered(lambda p: p.state == 'cancelled')),
-            'data': participants.read([
+            'total': sum(counts.values()),
+            'completed': counts.get('confirmed', 0),
+            'pending': counts.get('not_yet_confirmed', 0),
+            'rescheduled': counts.get('rescheduled', 0),
+            'cancelled': counts.get('cancelled', 0),
+            # Only the first 10 participants are previewed in the panel
+            'data': Participant.search_read([('project_id', '=', self.id)], [
                 'first_name', 'last_name', 'state',
                 'completion_date', 'email_address', 'mobile_phone'
-            ])[:10],  # Limit to first 10 for performance
+            ], limit=10),
         }
     
     @api.model
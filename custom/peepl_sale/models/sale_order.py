@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from collections import defaultdict
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError
@@ -256,40 +257,43 @@ class SaleOrder(models.Model):
         
         return result
 
+    def _get_participant_fallback_project(self):
+        """Most recent project of the order, used for participants of lines without project"""
+        self.ensure_one()
+        if self.project_ids:
+            return max(self.project_ids, key=lambda project: project.create_date)
+        return self.env['project.project']
+
     def _link_participants_to_projects(self):
-        """Ensure all participants in this sale order are linked to appropriate projects"""
-        for order in self:
-            # Process participant-based lines
-            participant_lines = order.order_line.filtered(
-                lambda line: line.qty_delivered_method == 'participants'
-            )
-            
-            for line in participant_lines:
-                # Get participants for this line
-                participants = line.related_participants_ids
-                if line.auto_link_participants and not participants:
-                    participants = order.participant_ids
-                
-                if participants:
-                    # Find the appropriate project for this line
-                    project = None
-                    
-                    if hasattr(line, 'project_id') and line.project_id:
-                        project = line.project_id
-                    elif hasattr(line, 'task_id') and line.task_id and line.task_id.project_id:
-                        project = line.task_id.project_id
-                    elif order.project_ids:
-                        # Use the most recent project
-                        project = order.project_ids.sorted('create_date', reverse=True)[0]
-                    
-                    if project:
-                        # Update participants with project link
-                        participants_to_update = participants.filtered(lambda p: not p.project_id)
-                        if participants_to_update:
-                            participants_to_update.write({'project_id': project.id})
-                            
-                        # Also ensure they're linked to the sale line if auto-link is enabled
-                        if line.auto_link_participants:
-                            unlinked_participants = participants.filtered(lambda p: not p.sale_line_id)
-                            if unlinked_participants:
-                                unlinked_participants.write({'sale_line_id': line.id})
+        """Ensure all participants in these sale orders are linked to appropriate projects.
+
+        Projects are resolved once per line for all the orders, then participants
+        are assigned with one write per project and one write per sale line.
+        """
+        participant_lines = self.order_line.filtered(
+            lambda line: line.qty_delivered_method == 'participants'
+        )
+        line_participants = participant_lines._get_line_participants()
+        line_projects = participant_lines._get_participant_projects()
+
+        participants_by_project = defaultdict(lambda: self.env['participant'])
+        # A participant shared by several lines keeps the project of the first line
+        queued = self.env['participant']
+        for line, participants in line_participants.items():
+            project = line_projects[line]
+            if not participants or not project:
+                continue
+            # Update participants with project link
+            to_link = participants.filtered(lambda p: not p.project_id) - queued
+            participants_by_project[project] |= to_link
+            queued |= to_link
+
+            # Also ensure they're linked to the sale line if auto-link is enabled
+            if line.auto_link_participants:
+                unlinked_participants = participants.filtered(lambda p: not p.sale_line_id)
+                if unlinked_participants:
+                    unlinked_participants.write({'sale_line_id': line.id})
+
+        for project, participants in participants_by_project.items():
+            if participants:
+                participants.write({'project_id': project.id})
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 # Part of Peepl Sale Module - Extends sale order line for participant invoicing
 
+from collections import defaultdict
+
 from odoo import api, fields, models, _
 
 
@@ -50,23 +52,63 @@ class SaleOrderLine(models.Model):
         help='Automatically link sale order participants to this line when using participant delivery method'
     )
 
-    @api.depends('related_participants_ids', 'related_participants_ids.state', 'all_order_participants_ids', 'all_order_participants_ids.state', 'auto_link_participants')
-    def _compute_participants_count(self):
-        for line in self:
-            if line.qty_delivered_method == 'participants':
+    def _get_participant_counts(self):
+        """Total and confirmed participants of the participant-based lines in self.
+
+        Lines count their linked participants, or all the participants of their
+        order when auto-linking and nothing is linked yet. The counts of all the
+        lines come from at most two grouped queries.
+        Returns ``{line: (total, confirmed)}``.
+        """
+        lines = self.filtered(lambda sol: sol.qty_delivered_method == 'participants')
+        saved_lines = lines.filtered(lambda sol: sol._origin)
+        Participant = self.env['participant']
+        counts = {}
+
+        linked_counts = defaultdict(lambda: [0, 0])
+        if saved_lines:
+            groups = Participant.read_group(
+                [('sale_line_id', 'in', saved_lines._origin.ids)],
+                ['sale_line_id', 'state'], ['sale_line_id', 'state'], lazy=False)
+            for group in groups:
+                line_counts = linked_counts[group['sale_line_id'][0]]
+                line_counts[0] += group['__count']
+                if group['state'] == 'confirmed':
+                    line_counts[1] += group['__count']
+
+        order_lines = saved_lines.filtered(
+            lambda sol: sol.auto_link_participants and sol._origin.id not in linked_counts)
+        order_counts = defaultdict(lambda: [0, 0])
+        if order_lines:
+            groups = Participant.read_group(
+                [('sale_order_id', 'in', order_lines._origin.order_id.ids)],
+                ['sale_order_id', 'state'], ['sale_order_id', 'state'], lazy=False)
+            for group in groups:
+                order_count = order_counts[group['sale_order_id'][0]]
+                order_count[0] += group['__count']
+                if group['state'] == 'confirmed':
+                    order_count[1] += group['__count']
+
+        for line in lines:
+            if not line._origin:
+                # New line of an onchange, only the cache knows its participants
                 if line.auto_link_participants and not line.related_participants_ids:
-                    # Use all order participants if no specific linking
-                    all_participants = line.all_order_participants_ids
-                    completed_participants = all_participants.filtered(lambda p: p.state == 'confirmed')
+                    participants = line.all_order_participants_ids
                 else:
-                    # Use specifically linked participants
-                    all_participants = line.related_participants_ids
-                    completed_participants = all_participants.filtered(lambda p: p.state == 'confirmed')
-                line.participants_count = len(all_participants)
-                line.completed_participants_count = len(completed_participants)
+                    participants = line.related_participants_ids
+                confirmed = participants.filtered(lambda p: p.state == 'confirmed')
+                counts[line] = (len(participants), len(confirmed))
+            elif line in order_lines:
+                counts[line] = tuple(order_counts[line._origin.order_id.id])
             else:
-                line.participants_count = 0
-                line.completed_participants_count = 0
+                counts[line] = tuple(linked_counts[line._origin.id])
+        return counts
+
+    @api.depends('related_participants_ids', 'related_participants_ids.state', 'all_order_participants_ids', 'all_order_participants_ids.state', 'auto_link_participants')
+    def _compute_participants_count(self):
+        counts = self._get_participant_counts()
+        for line in self:
+            line.participants_count, line.completed_participants_count = counts.get(line, (0, 0))
 
     @api.depends('product_id')
     def _compute_qty_delivered_method(self):
@@ -90,30 +132,9 @@ class SaleOrderLine(models.Model):
         if not lines_by_participants:
             return
 
+        counts = lines_by_participants._get_participant_counts()
         for line in lines_by_participants:
-            try:
-                if line.auto_link_participants and not line.related_participants_ids:
-                    # Use all order participants
-                    all_participants = line.all_order_participants_ids
-                    completed_participants = all_participants.filtered(lambda p: p.state == 'confirmed')
-                    completed_count = len(completed_participants)
-                else:
-                    # Use specifically linked participants
-                    linked_participants = line.related_participants_ids
-                    completed_participants = linked_participants.filtered(lambda p: p.state == 'confirmed')
-                    completed_count = len(completed_participants)
-                
-                # Update qty_delivered
-                line.qty_delivered = completed_count
-                
-                _logger = logging.getLogger(__name__)
-                _logger.info(f"Line {line.id}: Updated qty_delivered to {completed_count}")
-                
-            except Exception as e:
-                import logging
-                _logger = logging.getLogger(__name__)
-                _logger.error(f"Error computing qty_delivered for line {line.id}: {e}")
-                line.qty_delivered = 0
+            line.qty_delivered = counts[line][1]
 
     def force_qty_delivered_recompute(self):
         """Force recomputation of qty_delivered for participant-based lines"""
@@ -167,42 +188,58 @@ class SaleOrderLine(models.Model):
         result = super()._timesheet_service_generation()
         
         # **FIX: Handle participant linking/generation for participant-based lines AFTER project creation**
-        for line in self.filtered(lambda sol: sol.product_id.service_policy == 'delivered_participants'):
+        participant_lines = self.filtered(lambda sol: sol.product_id.service_policy == 'delivered_participants')
+        for line in participant_lines:
             if line.auto_link_participants:
                 line._link_order_participants_to_line()
             else:
                 line._generate_participants_from_quantity()
                 
-            # **FIX: Force recompute project_id on participants after linking**
-            line._update_participants_project_link()
+        # **FIX: Update project_id on participants after linking, once for all lines**
+        participant_lines._update_participants_project_link()
         
         return result
 
+    def _get_line_participants(self):
+        """Participants of each line: the linked ones, or all the order participants
+        when auto-linking and nothing is linked yet. Returns ``{line: participants}``"""
+        return {
+            line: line.all_order_participants_ids
+            if line.auto_link_participants and not line.related_participants_ids
+            else line.related_participants_ids
+            for line in self
+        }
+
+    def _get_participant_projects(self):
+        """Project of the participants of each line, resolved once per line.
+
+        The line project, else the project of its task, else the latest project
+        of the order (looked up once per order). Returns ``{line: project}``.
+        """
+        order_projects = {}
+        line_projects = {}
+        for line in self:
+            project = line.project_id or line.task_id.project_id
+            if not project:
+                if line.order_id not in order_projects:
+                    order_projects[line.order_id] = line.order_id._get_participant_fallback_project()
+                project = order_projects[line.order_id]
+            line_projects[line] = project
+        return line_projects
+
     def _update_participants_project_link(self):
-        """Force update project link on participants after project/task creation"""
-        self.ensure_one()
-        
-        # Get all participants linked to this line
-        participants = self.related_participants_ids
-        if self.auto_link_participants and not participants:
-            participants = self.all_order_participants_ids
-        
-        if participants:
-            # Force recompute project_id field
-            participants._compute_project_id()
-            
-            # **Alternative approach: If computed field doesn't work, set directly**
-            project = False
-            if hasattr(self, 'project_id') and self.project_id:
-                project = self.project_id
-            elif hasattr(self, 'task_id') and self.task_id and self.task_id.project_id:
-                project = self.task_id.project_id
-            elif self.order_id and hasattr(self.order_id, 'project_ids') and self.order_id.project_ids:
-                project = self.order_id.project_ids.sorted('create_date', reverse=True)[0]
-            
-            if project:
-                # Direct assignment as fallback
-                participants.write({'project_id': project.id})
+        """Update project link on participants after project/task creation,
+        with one write per project for all the lines in self"""
+        line_participants = self._get_line_participants()
+        line_projects = self._get_participant_projects()
+        participants_by_project = defaultdict(lambda: self.env['participant'])
+        for line, participants in line_participants.items():
+            project = line_projects[line]
+            if participants and project:
+                participants_by_project[project] |= participants
+
+        for project, participants in participants_by_project.items():
+            participants.filtered(lambda p: p.project_id != project).write({'project_id': project.id})
 
     def write(self, vals):
         """Override to update participants when project is assigned"""
@@ -210,8 +247,7 @@ class SaleOrderLine(models.Model):
         
         # **FIX: When project_id or task_id is assigned, update participants**
         if any(field in vals for field in ['project_id', 'task_id']):
-            for line in self.filtered(lambda sol: sol.qty_delivered_method == 'participants'):
-                line._update_participants_project_link()
+            self.filtered(lambda sol: sol.qty_delivered_method == 'participants')._update_participants_project_link()
         
         return result
 
@@ -0,0 +1 @@
+from . import test_invoice_sync
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+from odoo import Command
+from odoo.tests.common import tagged
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+
+@tagged('post_install', '-at_install')
+class TestInvoiceSync(AccountTestInvoicingCommon):
+
+    @classmethod
+    def setUpClass(cls, chart_template_ref=None):
+        super().setUpClass(chart_template_ref=chart_template_ref)
+        cls.partner = cls.partner_a
+        cls.sale_tax = cls.company_data['default_tax_sale']
+        cls.product_tax = cls.sale_tax.copy({'name': 'Product Tax', 'amount': cls.sale_tax.amount + 10.0})
+        cls.participant_product = cls.env['product.product'].create({
+            'name': 'Assessment',
+            'type': 'service',
+            'service_policy': 'delivered_participants',
+        })
+        cls.product_a = cls.env['product.product'].create({
+            'name': 'Consulting A',
+            'type': 'service',
+            'list_price': 100.0,
+            'taxes_id': [Command.set(cls.sale_tax.ids)],
+        })
+        cls.product_b = cls.env['product.product'].create({
+            'name': 'Consulting B',
+            'type': 'service',
+            'list_price': 250.0,
+            'taxes_id': [Command.set(cls.product_tax.ids)],
+        })
+        cls.order = cls.env['sale.order'].create({
+            'partner_id': cls.partner.id,
+            'order_line': [
+                Command.create({'product_id': cls.participant_product.id, 'product_uom_qty': 1.0}),
+                Command.create({
+                    'product_id': cls.product_a.id,
+                    'name': 'Consulting',
+                    'product_uom_qty': 2.0,
+                    'price_unit': 100.0,
+                    'tax_id': [Command.set(cls.sale_tax.ids)],
+                }),
+            ],
+        })
+        cls.sale_line = cls.order.order_line.filtered(lambda line: line.product_id == cls.product_a)
+
+    def test_product_swap_keeps_sale_line_values(self):
+        """Swapping the product of a sale line keeps its price, taxes and label on the invoice"""
+        invoice = self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'source_sale_order_id': self.order.id,
+        })
+        invoice_line = invoice.invoice_line_ids.filtered(lambda line: line.sale_line_ids == self.sale_line)
+        self.assertEqual(invoice_line.product_id, self.product_a)
+
+        self.sale_line.write({'product_id': self.product_b.id})
+        self.sale_line.write({
+            'name': 'Consulting',
+            'price_unit': 100.0,
+            'tax_id': [Command.set(self.sale_tax.ids)],
+        })
+        invoice._sync_invoice_lines_with_sale_order()
+
+        self.assertEqual(invoice.invoice_line_ids.filtered(lambda line: line.sale_line_ids == self.sale_line), invoice_line,
+                         'The invoice line is updated, not replaced')
+        self.assertEqual(invoice_line.product_id, self.product_b)
+        self.assertEqual(invoice_line.price_unit, 100.0)
+        self.assertEqual(invoice_line.tax_ids, self.sale_tax)
+        self.assertEqual(invoice_line.name, 'Consulting')
+        self.assertEqual(invoice_line.quantity, 2.0)